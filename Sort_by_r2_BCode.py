@@ -16,13 +16,24 @@ read, both, or neither.
 If the output file names are not specified by the user, output file names will
 be automatically generated by the program.
 
+Many pairs of input files can be sorted by a single run of this program, using a
+job file. The pairs of files are sorted concurrently.
+
 
 
 USAGE:
     
     python27 Sort_by_r2_BCode.py <input_path_r1> <input_path_r2> <barcode>
             [-o <p1> <p2> <p3> <p4> <p5> <p6>] [-t <threshold_match>
-            <threshold_partial>] [-r Y|N Y|N]
+            <threshold_partial>] [-r Y|N Y|N] [-d <category>] [-m Y|N]
+            [-u Y|N] [-c Y|N] [--max-memory <size>] [--max-offset <K>]
+            [--quality-cutoff <Q>] [--quality-weight <W>]
+            [--engine STR|BYTES] [--validate Y|N]
+            [--shard-records <N>] [--shard-size <size>] [--min-length <N>]
+            [--length-histogram <filepath>] [--max-n <fraction>]
+            [--n-window READ|BARCODE] [--n-mates R1|R2|EITHER|BOTH]
+    
+    python27 Sort_by_r2_BCode.py --jobs <job_file> [--lanes <N>] [<options>]
 
 
 
@@ -39,7 +50,31 @@ MANDATORY:
     barcode
         
         The nucleotide sequence being looked for in the r2 file.
-        Ambiguous nucleotides accepted.OPTIONAL:
+        Ambiguous nucleotides accepted.
+
+JOB FILE MODE:
+    
+    job_file
+        
+        The filepath of a job file, listing many pairs of input files to be
+        sorted. Each line of the job file has the following fields, separated by
+        tabs or spaces:
+            
+            <input_path_r1> <input_path_r2> <barcode> [<p1> ... <p6>]
+        
+        The output filepaths are optional, and are generated from the input
+        filepaths if not specified. Empty lines, and lines beginning with #,
+        are ignored. The -o option cannot be used in this mode. All other
+        options apply to every job.
+    
+    (--lanes)
+        
+        <N>
+            
+            (DEFAULT: 4)
+            
+            The number of jobs to sort at the same time. The opening, reading,
+            and writing of the files of different jobs are overlapped.
 
 OPTIONAL:
     
@@ -120,6 +155,215 @@ OPTIONAL:
             
             Whether the barcodes or partial barcodes should be removed from the
             R1 output or not.
+    
+    (-d)
+        
+        <category>
+            
+            (DEFAULT: None)
+            
+            Discard all read pairs of this category instead of writing them to
+            file. No output files are created for a discarded category.
+            Discarded reads are still counted. Accepted categories are:
+                MATCH
+                PARTIAL
+                ABSENT
+                UNREADABLE
+                SHORT
+            This option may be used more than once.
+    
+    (-m)
+        
+        Y|N
+            
+            (DEFAULT: N)
+            
+            Whether read pairs with a partial match should be written to the
+            same output files as read pairs with a complete match. No output
+            files are created for partial matches if this is enabled.
+    
+    (-u)
+        
+        Y|N
+            
+            (DEFAULT: N)
+            
+            Whether unreadable read pairs should be written to their own pair of
+            output files, instead of being discarded. The output file names are
+            generated from the input file names.
+    
+    (-c)
+        
+        Y|N
+            
+            (DEFAULT: N)
+            
+            Count-only mode. If enabled, no output files are created at all and
+            only the metrics are reported.
+    
+    (--max-memory)
+        
+        <size>
+            
+            (DEFAULT: No limit)
+            
+            The maximum amount of memory the program should use. The sizes of
+            the read batches and output buffers are chosen to fit within this
+            budget, and the batch size is reduced during the run if memory use
+            gets close to the limit. Accepts a number of bytes, or a number with
+            a K, M, or G suffix. (Ex. 512M, 2G)
+            
+            The peak memory use, and the sizes chosen, are reported with the
+            metrics.
+    
+    (--max-offset)
+        
+        <K>
+            
+            (DEFAULT: 0)
+            
+            The maximum number of nucleotides which may come before the barcode
+            at the start of the r2 read. The barcode is searched for at every
+            offset from 0 to K, and the offset with the fewest mismatches is
+            used. (The lowest offset is used in the event of a tie.) If the
+            barcode is removed from the R2 output, the nucleotides before it are
+            removed as well.
+            
+            A histogram of the offsets at which barcodes were found is reported
+            with the metrics.
+    
+    (--quality-cutoff)
+        
+        <Q>
+            
+            (DEFAULT: None)
+            
+            A Phred quality score. If specified, mismatches between the barcode
+            and r2 bases with a quality score below this are given a reduced
+            weight (see --quality-weight) and the match and partial thresholds
+            are applied to the total weight of the mismatches, instead of the
+            number of mismatches. Quality scores are assumed to be Phred+33.
+    
+    (--quality-weight)
+        
+        <W>
+            
+            (DEFAULT: 0)
+            
+            The weight, from 0 to 1, given to mismatches at low quality bases.
+            The default of 0 ignores them completely. Mismatches at all other
+            bases have a weight of 1.
+    
+    (--engine)
+        
+        STR|BYTES
+            
+            (DEFAULT: STR in Python 2, BYTES in Python 3)
+            
+            The engine used to read, process, and write the reads. The STR
+            engine reads the files as text. The BYTES engine reads and writes
+            the files in binary, and processes the reads as bytes. Both engines
+            produce the same output files.
+    
+    (--validate)
+        
+        Y|N
+            
+            (DEFAULT: N)
+            
+            Whether to check that the r1 and r2 files are in step while they
+            are being sorted. Sorting stops with an error, giving the number of
+            the first bad read pair, if:
+                The r1 and r2 files have a different number of reads
+                The IDs of a read pair do not match (Up to the first space or
+                        "/" in the IDs.)
+                The sequence and quality scores of a read have different
+                        lengths
+            Any output files already written are deleted, and the program exits
+            with a status of 1.
+    
+    (--shard-records)
+        
+        <N>
+            
+            (DEFAULT: No limit)
+            
+            Write each output file as a series of numbered files ("shards"),
+            each containing up to N reads. (Ex. reads_r1__MATCH.0001.fq,
+            reads_r1__MATCH.0002.fq) The r1 and r2 shards always contain the
+            same read pairs. A manifest listing every shard and the number of
+            reads in it is written to a file whose name is generated from the
+            r1 input file name. (Ex. reads_r1__SHARDS.tsv) Existing shards of
+            the output files, such as those of an earlier run, are checked for
+            overwriting like any other output file, and are deleted before
+            sorting.
+    
+    (--shard-size)
+        
+        <size>
+            
+            (DEFAULT: No limit)
+            
+            Write each output file as a series of shards (see --shard-records),
+            starting a new pair of shards once either shard reaches this size.
+            Accepts a number of bytes, or a number with a K, M, or G suffix.
+            (Ex. 500M) May be used together with --shard-records.
+    
+    (--min-length)
+        
+        <N>
+            
+            (DEFAULT: None)
+            
+            The minimum length of the r1 and r2 reads, after the barcodes have
+            been removed. Read pairs with a shorter read are regarded as "short"
+            and are written to their own pair of output files, instead of the
+            files for their category. The output file names are generated from
+            the input file names. Use "-d SHORT" to discard them instead. Only
+            read pairs of categories which are written to file are checked.
+    
+    (--length-histogram)
+        
+        <filepath>
+            
+            (DEFAULT: None)
+            
+            Write a histogram of the lengths of the r1 and r2 reads, after the
+            barcodes have been removed, for each category of read pairs written
+            to file, to this file. The histogram is written as a table of
+            tab-separated values.
+    
+    (--max-n)
+        
+        <fraction>
+            
+            (DEFAULT: None)
+            
+            The largest fraction, from 0 to 1, of N bases a read may have
+            without being regarded as unreadable. (See --n-window and
+            --n-mates) If this is not specified, a read pair is unreadable if
+            both reads begin with 10 Ns.
+    
+    (--n-window)
+        
+        READ|BARCODE
+            
+            (DEFAULT: READ)
+            
+            The part of each read the fraction of N bases is calculated over.
+            READ uses the whole read. BARCODE uses only the part of the read
+            where the barcode is searched for: the start of the r2 read, up to
+            the maximum barcode offset plus the barcode length, and the end of
+            the r1 read, the length of the barcode.
+    
+    (--n-mates)
+        
+        R1|R2|EITHER|BOTH
+            
+            (DEFAULT: BOTH)
+            
+            Which reads of a read pair must have too many N bases for the read
+            pair to be regarded as unreadable.
 
 
 
@@ -131,6 +375,13 @@ EXAMPLES EXPLANATION:
     
     2:
     More advanced use case with more options specified.
+    
+    3:
+    Only keep the read pairs with a complete or partial match, in a single
+    pair of output files, and discard the rest.
+    
+    4:
+    Sort every pair of files listed in a job file, 8 at a time.
 
 EXAMPLES:
     
@@ -140,12 +391,24 @@ EXAMPLES:
             reads_match_r1.fq reads_match_r2.fq reads_partial_r1.fq
             reads_partial_r2.fq reads_absent_r1.fq reads_absent_r2.fq -t 1 2
             -r YES YES
+    
+    python27 Sort_by_r2_BCode.py reads_r1.fq reads_r2.fq CGTGAT -m Y -d ABSENT
+    
+    python27 Sort_by_r2_BCode.py --jobs amplicons.txt --lanes 8 -t 0 1
 
 USAGE:
     
     python27 Sort_by_r2_BCode.py <input_path_r1> <input_path_r2> <barcode>
             [-o <p1> <p2> <p3> <p4> <p5> <p6>] [-t <threshold_match>
-            <threshold_partial>] [-r Y|N Y|N]
+            <threshold_partial>] [-r Y|N Y|N] [-d <category>] [-m Y|N]
+            [-u Y|N] [-c Y|N] [--max-memory <size>] [--max-offset <K>]
+            [--quality-cutoff <Q>] [--quality-weight <W>]
+            [--engine STR|BYTES] [--validate Y|N]
+            [--shard-records <N>] [--shard-size <size>] [--min-length <N>]
+            [--length-histogram <filepath>] [--max-n <fraction>]
+            [--n-window READ|BARCODE] [--n-mates R1|R2|EITHER|BOTH]
+    
+    python27 Sort_by_r2_BCode.py --jobs <job_file> [--lanes <N>] [<options>]
 """
 
 NAME = "Sort_by_r2_BCode.py"
@@ -170,10 +433,42 @@ PRINT_METRICS = True
 FILEMOD__MATCH =   "__MATCH"
 FILEMOD__PARTIAL = "__PARTIAL"
 FILEMOD__ABSENT =  "__ABSENT"
+FILEMOD__UNREADABLE = "__UNREADABLE"
+FILEMOD__SHORT = "__SHORT"
+FILEMOD__SHARDS = "__SHARDS.tsv"
+
+CONFIG__SHARD_DIGITS = 4 # Number of digits in the shard numbers
+
+CONFIG__LENGTHS_INITIAL = 301 # Initial size of the read length histograms,
+#                               which are extended if longer reads are found
 
 CONFIG__N_SPAM_CUTOFF = 10 # If the first N nucleotides are all N on both reads,
 #                            then regard the read as "unreadable"
 
+CONFIG__MEMORY_SHARE_BATCHES = 0.5 # Fraction of the memory budget, after the
+#                                    program's own baseline usage, given to read
+#                                    batches
+CONFIG__MEMORY_SHARE_BUFFERS = 0.2 # Fraction given to file buffers
+CONFIG__MEMORY_SHARE_INDEX = 0.1 # Fraction given to the barcode index
+CONFIG__MEMORY_HIGH_WATER = 0.9 # Halve the batch size if memory usage goes above
+#                                 this fraction of the budget
+CONFIG__MEMORY_CHECK_INTERVAL = 10000 # Read pairs between memory usage checks
+CONFIG__BYTES_PER_PAIR = 2000 # Estimated memory used per read pair in a batch
+CONFIG__BATCH_SIZE_MAX = 100000
+CONFIG__BUFFER_SIZE_MIN = 4096
+CONFIG__BUFFER_SIZE_MAX = 1048576
+
+CONFIG__PHRED_OFFSET = 33
+
+CONFIG__INDEX_ENTRIES_MAX = 1000000 # Largest barcode neighbourhood index to
+#                                     build. Larger barcodes, or higher
+#                                     thresholds, use a bit-parallel search
+CONFIG__BYTES_PER_INDEX_ENTRY = 150 # Estimated memory used per index entry
+CONFIG__TAIL_CHECK_SEED = 20181 # Seed for the sequences a Tail_Matcher is
+#                                 checked against NSeq_Match with
+
+CONFIG__QUEUE_DEPTH_PER_LANE = 2 # Jobs waiting to be sorted, per lane
+
 
 # Defaults #####################################################################
 "NOTE: altering these will not alter the values displayed in the HELP DOC"
@@ -184,14 +479,49 @@ DEFAULT__threshold_partial = 0
 DEFAULT__remove_r1 = True
 DEFAULT__remove_r2 = True
 
+DEFAULT__merge_partial = False
+DEFAULT__write_unreadable = False
+DEFAULT__count_only = False
+
+DEFAULT__max_offset = 0
+
+DEFAULT__quality_weight = 0.0
+
+DEFAULT__batch_size = 1000
+
+DEFAULT__validate = False
+
+DEFAULT__n_window = "READ" # Resolved below, into N_WINDOW and MATES values
+DEFAULT__n_mates = "BOTH"
+
+DEFAULT__engine = None # Resolved below, based on the version of Python
+
+DEFAULT__lanes = 4
+
 
 
 # Imported Modules #############################################################
 
+import operator
+import os
+import random
+import re
 import sys
+import threading
+import time
 
 import NSeq_Match
 
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+try:
+    import queue
+except ImportError: # Python 2
+    import Queue as queue
+
 
 
 # Enums ########################################################################
@@ -200,6 +530,27 @@ class ALIGN:
     LEFT=1
     RIGHT=2
 
+class ENGINE:
+    STR=1
+    BYTES=2
+
+class N_WINDOW:
+    READ=1
+    BARCODE=2
+
+class MATES:
+    R1=1
+    R2=2
+    EITHER=3
+    BOTH=4
+
+class CATEGORY:
+    MATCH=1
+    PARTIAL=2
+    ABSENT=3
+    UNREADABLE=4
+    SHORT=5
+
 
 
 # Strings ######################################################################
@@ -243,8 +594,56 @@ any complete or partial barcode matches from the sequences.
 STR__invalid_threshold = "\nERROR: Please specify a non-negative integer for "\
         "your cutoff thresholds."
 
+STR__invalid_memory = "\nERROR: Please specify a memory size such as 512M or "\
+        "2G. You specified:\n\t{s}"
+
+STR__invalid_offset = "\nERROR: Please specify a non-negative integer for the "\
+        "maximum barcode offset."
+
+STR__invalid_quality_cutoff = "\nERROR: Please specify a non-negative integer "\
+        "for the quality cutoff."
+STR__invalid_quality_weight = "\nERROR: Please specify a number from 0 to 1 "\
+        "for the quality weight."
+
+STR__invalid_engine = "\nERROR: Invalid engine: {s}\nPlease specify STR or "\
+        "BYTES."
+
+STR__invalid_lanes = "\nERROR: Please specify a positive integer for the number "\
+        "of lanes."
+STR__invalid_job_file = "\nERROR: Please specify a job file after --jobs."
+STR__invalid_job_line = "\nERROR: Invalid line {n} in the job file:\n\t{s}"
+STR__jobs_no_outputs = "\nERROR: The -o option cannot be used with a job file."
+STR__no_jobs = "\nERROR: The job file does not contain any jobs."
+STR__jobs_collision = "\nERROR: More than one job would write this file, or "\
+        "a job would write over an input file:\n\t{f}"
+
+STR__invalid_shard_records = "\nERROR: Please specify a positive integer for "\
+        "the number of reads per shard."
+STR__invalid_shard_size = "\nERROR: Please specify a shard size such as 500M "\
+        "or 2G. You specified:\n\t{s}"
+
+STR__invalid_min_length = "\nERROR: Please specify a positive integer for the "\
+        "minimum read length."
+STR__invalid_histogram_path = "\nERROR: Please specify a filepath for the "\
+        "length histogram."
+
+STR__invalid_max_n = "\nERROR: Please specify a number from 0 to 1 for the "\
+        "maximum fraction of N bases."
+STR__invalid_n_window = "\nERROR: Invalid N window: {s}\nPlease specify READ "\
+        "or BARCODE."
+STR__invalid_n_mates = "\nERROR: Invalid N mates: {s}\nPlease specify R1, R2, "\
+        "EITHER, or BOTH."
+
 STR__invalid_bool = "\nERROR: Please specify Yes/No. You specified:\n\t{s}"
 
+STR__invalid_category = "\nERROR: Invalid read category: {s}\nPlease specify "\
+        "MATCH, PARTIAL, ABSENT, UNREADABLE, or SHORT."
+
+STR__invalid_argument = "\nERROR: Invalid argument: {s}"
+
+STR__overwrite_confirm_jobs = "\n{n} output files already exist. Do you wish "\
+        "to overwrite them? (y/n): "
+
 STR__overwrite_confirm = "\nFile already exists:\n\t{f}\nDo you wish to "\
         "overwrite it? (y/n): "
 
@@ -260,6 +659,46 @@ STR__metrics_partials =    "Total Partials:    {s} ( {p1}% of usable, {p2}% "\
 STR__metrics_absents =     "Total Absents:     {s} ( {p1}% of usable, {p2}% "\
         "of total)"
 
+STR__metrics_shorts =    "\nShort Pairs:       {s} ( {p1}% of usable, {p2}% "\
+        "of total)"
+
+STR__metrics_offsets = "\nBarcode Offsets:"
+STR__metrics_offset =  "    {o}: {s} ( {p}% )"
+
+STR__metrics_jobs =        "\nJobs:              {s}"
+STR__metrics_jobs_failed =   "Failed Jobs:       {s}"
+STR__metrics_time =          "Time Taken:        {s} seconds"
+STR__metrics_throughput =    "Throughput:        {s} pairs/sec"
+
+STR__validation_failed = "\nERROR: The input files failed validation:\n\t{e}"
+STR__validation_count = "Read pair {n}: The {r} file has more reads than the "\
+        "other file."
+STR__validation_empty = "Read pair {n}: Empty sequence."
+STR__validation_IDs = "Read pair {n}: The read IDs do not match:\n\t{s1}\n\t{s2}"
+STR__validation_lengths = "Read pair {n}: The {r} sequence and quality scores "\
+        "have different lengths."
+
+STR__metrics_manifest = "\nShard Manifest:    {f}"
+STR__metrics_histogram = "\nLength Histogram:  {f}"
+
+STR__histogram_length = "Length"
+STR__histogram_column = "{c}_R{r}"
+
+STR__manifest_header = "Category\tR1\tR2\tReads\n"
+STR__manifest_line = "{c}\t{f1}\t{f2}\t{n}\n"
+
+STR__job_failed = "\nERROR: Job failed:\n\t{f1}\n\t{f2}\n\t{e}"
+
+STR__metrics_peak_rss = "\nPeak Memory (RSS): {s} MB"
+STR__metrics_memory_budget = "Memory Budget:     {s} MB"
+STR__metrics_batch_size =    "Batch Size:        {s} pairs (initially {i}, "\
+        "reduced {n} times)"
+STR__metrics_buffer_size =   "Output Buffers:    {s} bytes per file"
+STR__metrics_index_size =    "Index Limit:       {s} entries"
+
+STR__memory_budget_low = "\nWARNING: The memory budget is smaller than the "\
+        "memory already in use. Minimum batch and buffer sizes will be used."
+
 
 
 STR__parsing_args = "\nParsing arguments..."
@@ -268,6 +707,8 @@ STR__sort_by_r2_bcode_begin = "\nRunning Sort_by_r2_BCode..."
 
 STR__sort_by_r2_bcode_complete = "\nSorting successfully finished."
 
+STR__sort_jobs_begin = "\nRunning Sort_by_r2_BCode on {n} jobs, {l} at a time..."
+
 
 
 # Lists ########################################################################
@@ -277,24 +718,1094 @@ LIST__help = ["-h", "-H", "-help", "-Help", "-HELP"]
 LIST__yes = ["Y", "y", "YES", "Yes", "yes", "T", "t", "TRUE", "True", "true"]
 LIST__no = ["N", "n", "NO", "No", "no", "F", "f", "FALSE", "False", "false"]
 
+LIST__categories = [CATEGORY.MATCH, CATEGORY.PARTIAL, CATEGORY.ABSENT,
+        CATEGORY.UNREADABLE, CATEGORY.SHORT]
+
 
 
 # Dictionaries #################################################################
 
+DICT__memory_units = {
+        "": 1,
+        "K": 1024,
+        "M": 1024*1024,
+        "G": 1024*1024*1024}
+
+DICT__engines = {
+        "STR": ENGINE.STR,
+        "BYTES": ENGINE.BYTES}
+
+DICT__n_windows = {
+        "READ": N_WINDOW.READ,
+        "BARCODE": N_WINDOW.BARCODE}
+
+DICT__mates = {
+        "R1": MATES.R1,
+        "R2": MATES.R2,
+        "EITHER": MATES.EITHER,
+        "BOTH": MATES.BOTH}
+
+DICT__categories = {
+        "MATCH": CATEGORY.MATCH,
+        "PARTIAL": CATEGORY.PARTIAL,
+        "ABSENT": CATEGORY.ABSENT,
+        "UNREADABLE": CATEGORY.UNREADABLE,
+        "SHORT": CATEGORY.SHORT}
+
 
 
 # Resolve Variables ############################################################
 
+REGEX__non_ACGT = re.compile("[^ACGT]")
+REGEX__non_ACGT_bytes = re.compile(b"[^ACGT]")
+
 SEQ__N_SPAM_SEQ = "N" * CONFIG__N_SPAM_CUTOFF
+BYTES__N_SPAM_SEQ = b"N" * CONFIG__N_SPAM_CUTOFF
+
+GET__first = operator.itemgetter(0)
+GET__stem = operator.itemgetter(slice(None, -2)) # Read ID, without "/1" or "/2"
+GET__mate = operator.itemgetter(slice(-2, None))
+GET__stem_R = operator.itemgetter(slice(None, -3)) # Without "_R1" or "_R2"
+GET__mate_R = operator.itemgetter(slice(-3, None))
+
+DEFAULT__n_window = DICT__n_windows[DEFAULT__n_window]
+DEFAULT__n_mates = DICT__mates[DEFAULT__n_mates]
+
+PYTHON_3 = sys.version_info[0] >= 3
+
+if PYTHON_3:
+    raw_input = input
+    MODE__read = "r" # Universal newlines are the default
+    if DEFAULT__engine == None: DEFAULT__engine = ENGINE.BYTES
+else:
+    MODE__read = "U"
+    if DEFAULT__engine == None: DEFAULT__engine = ENGINE.STR
+
+
+
+# Classes ######################################################################
+
+class Sort_Metrics:
+    """
+    A record of the counters generated while sorting a pair of FASTQ files.
+    
+    Returned by Sort_Reads, and filled in by Iterate_Sorted_Batches as pairs are
+    yielded.
+    """
+    def __init__(self):
+        self.count_total = 0
+        self.count_NNN = 0
+        self.count_match = 0
+        self.count_partial = 0
+        self.count_absent = 0
+        self.count_short = 0
+        self.offsets = [0]
+        self.lengths = [[[0] * CONFIG__LENGTHS_INITIAL,
+                [0] * CONFIG__LENGTHS_INITIAL] for i in
+                range(max(LIST__categories) + 1)] # By category, then r1/r2
+        self.peak_rss = None
+    
+    def Get_Usable(self):
+        """
+        Return the number of read pairs which were not regarded as unreadable.
+        
+        Get_Usable() -> int
+        """
+        return self.count_total - self.count_NNN
+    
+    def Add(self, other):
+        """
+        Add the counters of another Sort_Metrics object to this one.
+        
+        Add(Sort_Metrics) -> None
+        """
+        self.count_total += other.count_total
+        self.count_NNN += other.count_NNN
+        self.count_match += other.count_match
+        self.count_partial += other.count_partial
+        self.count_absent += other.count_absent
+        self.count_short += other.count_short
+        Add_Counts(self.offsets, other.offsets)
+        for counts, other_counts in zip(self.lengths, other.lengths):
+            Add_Counts(counts[0], other_counts[0])
+            Add_Counts(counts[1], other_counts[1])
+        if self.peak_rss == None: self.peak_rss = other.peak_rss
+        elif other.peak_rss != None:
+            self.peak_rss = max(self.peak_rss, other.peak_rss)
+
+
+
+class Read_Pair_Error(Exception):
+    """
+    Raised when the r1 and r2 input files fail validation. [number] is the
+    number of the first bad read pair, counting from 1.
+    """
+    def __init__(self, number, message):
+        Exception.__init__(self, message)
+        self.number = number
+
+
+
+class Barcode_Matcher:
+    """
+    Finds the best match for a barcode at the start of a sequence, allowing for
+    up to [max_offset] nucleotides before the barcode.
+    
+    With an offset of 0, the barcode is compared to the start of the sequence
+    using NSeq_Match. Otherwise, all offsets are checked in a single pass, using
+    either:
+        
+        A neighbourhood index: a dictionary of every ACGT sequence within the
+        partial threshold of the barcode, and its number of mismatches. Every
+        offset is then a single dictionary lookup.
+        
+        A bit-parallel search, which counts the mismatches at every offset at
+        once, as a series of bit fields in a single integer. This is used when
+        the index would be too large, or when the sequence contains characters
+        other than A, C, G, and T.
+    
+    If a quality table is given, mismatches are weighted by the quality scores
+    of the sequence instead of simply being counted. Every sequence which could
+    be within the threshold once weighted is then indexed along with the
+    positions of its mismatches, so that the weight of each offset is a single
+    dictionary lookup and a few bit operations. A bit-parallel search is used
+    instead when this index would be too large.
+    
+    In bytes mode, sequences and quality scores are given as bytes, and the
+    index is used for every offset, including an offset of 0. Sequences which
+    cannot be looked up in the index are decoded and matched as strings.
+    """
+    def __init__(self, barcode, threshold, max_offset=0,
+                max_index_entries=CONFIG__INDEX_ENTRIES_MAX,
+                quality_table=None, bytes_mode=False):
+        """
+        @barcode
+                (str)
+                The DNA sequence being looked for.
+        @threshold
+                (int)
+                The maximum number of mismatches of interest. Sequences with
+                more mismatches than this at every offset are reported as having
+                [threshold]+1 mismatches.
+        @max_offset
+                (int)
+                The maximum number of nucleotides before the barcode.
+        @max_index_entries
+                (int)
+                The largest neighbourhood index which may be built.
+        @quality_table
+                (list<int/float>[256])
+                (Optional)
+                The weight of a mismatch for each quality score character, as
+                returned by Build_Quality_Table: 1 at or above the cutoff, and a
+                single reduced weight below it.
+        @bytes_mode
+                (bool)
+                Whether sequences will be given as bytes instead of strings.
+        """
+        self.barcode = barcode
+        self.length = len(barcode)
+        self.threshold = threshold
+        self.max_offset = max_offset
+        self.index = None
+        # Quality
+        self.quality_table = quality_table
+        self.quality_floor = None # Lowest quality character with a weight of 1
+        self.quality_weight = None # The reduced weight
+        if quality_table:
+            for i in range(256):
+                if quality_table[i] == 1 and min(quality_table[i:]) == 1:
+                    self.quality_floor = chr(i)
+                    break
+            self.quality_weight = min(quality_table)
+            flags = bytearray([[48, 49][quality_table[i] < 1] # "1" if reduced
+                    for i in range(256)])
+            self.quality_flags = bytes(flags)
+        self.masks = None
+        # Bit-parallel
+        self.field_bits = self.length.bit_length() + 1
+        self.field_mask = (1 << self.field_bits) - 1
+        self.state_mask = (1 << (self.field_bits * self.length)) - 1
+        self.last_field = self.field_bits * (self.length - 1)
+        self.char_masks = {}
+        # Index
+        self.bytes_mode = bytes_mode
+        if (max_offset or bytes_mode) and self.length:
+            size = Count_Neighbourhood(barcode, threshold)
+            if size <= max_index_entries:
+                self.index = Build_Neighbourhood(barcode, threshold)
+                if bytes_mode:
+                    self.index = dict([(Str_To_Bytes(k), v)
+                            for k, v in self.index.items()])
+        # Quality weighted index
+        if quality_table and self.length:
+            limit = 0 # Most mismatches which could be within the threshold
+            while limit < self.length and \
+                    (limit + 1) * self.quality_weight <= threshold:
+                limit += 1
+            size = Count_Neighbourhood(barcode, limit)
+            if size <= max_index_entries - len(self.index or ()):
+                self.masks = Build_Neighbourhood__Masks(barcode, limit)
+                if bytes_mode:
+                    self.masks = dict([(Str_To_Bytes(k), v)
+                            for k, v in self.masks.items()])
+    
+    def Match(self, seq, qc=None):
+        """
+        Return the lowest mismatch score between the barcode and [seq], and the
+        offset at which it occurs.
+        
+        The score is the number of mismatches, unless this Barcode_Matcher has a
+        quality table and the quality scores [qc] are given, in which case the
+        score is the total weight of the mismatches.
+        
+        Match(str, str) -> [int/float, int]
+        Match(bytes, bytes) -> [int/float, int]
+        """
+        if self.bytes_mode: return self.Match__Bytes(seq, qc)
+        return self.Match__Str(seq, qc)
+    
+    def Match__Bytes(self, seq, qc):
+        """
+        The bytes mode version of Match.
+        
+        Match__Bytes(bytes, bytes) -> [int/float, int]
+        """
+        length = self.length
+        region = seq[:length + self.max_offset]
+        index = self.index
+        if (index == None or len(region) < length or
+                REGEX__non_ACGT_bytes.search(region)):
+            if qc != None: qc = Bytes_To_Str(qc)
+            return self.Match__Str(Bytes_To_Str(seq), qc)
+        # Index
+        best = self.threshold + 1
+        best_offset = 0
+        for offset in range(len(region) - length + 1):
+            mismatches = index.get(region[offset:offset+length], best)
+            if mismatches < best:
+                best = mismatches
+                best_offset = offset
+                if not best: break
+        result = [best, best_offset]
+        # Quality
+        if self.quality_table == None or qc == None or not best: return result
+        if self.quality_floor != None:
+            region_qc = bytearray(qc[:len(region)])
+            if not region_qc or min(region_qc) >= ord(self.quality_floor):
+                return result
+        return self.Match__Weighted(seq, qc, result)
+    
+    def Match__Str(self, seq, qc):
+        """
+        The string version of Match.
+        
+        Match__Str(str, str) -> [int/float, int]
+        """
+        result = self.Match__Count(seq)
+        if self.quality_table == None or qc == None or not result[0]:
+            return result
+        # Weighted scores cannot be lower than the counts if every base in the
+        # region has a weight of 1
+        if self.quality_floor != None:
+            region_qc = qc[:self.length + self.max_offset]
+            if not region_qc or min(region_qc) >= self.quality_floor:
+                return result
+        # (In bytes mode, the weighted index is never used for strings)
+        if self.bytes_mode:
+            return self.Match__Weighted__Bit_Parallel(seq, qc, result)
+        return self.Match__Weighted(seq, qc, result)
+    
+    def Match__Count(self, seq):
+        """
+        Return the lowest number of mismatches between the barcode and [seq],
+        and the offset at which it occurs.
+        
+        Match__Count(str) -> [int, int]
+        """
+        if not self.max_offset:
+            return [NSeq_Match.NSeq_Match(self.barcode, seq[:self.length]), 0]
+        length = self.length
+        region = seq[:length + self.max_offset]
+        if len(region) <= length: # No room for any offset
+            return [NSeq_Match.NSeq_Match(self.barcode, region), 0]
+        # (In bytes mode, the index is never used for strings)
+        if self.index == None or self.bytes_mode or \
+                REGEX__non_ACGT.search(region):
+            return self.Match__Bit_Parallel(region)
+        # Index
+        index = self.index
+        best = self.threshold + 1
+        best_offset = 0
+        for offset in range(len(region) - length + 1):
+            mismatches = index.get(region[offset:offset+length], best)
+            if mismatches < best:
+                best = mismatches
+                best_offset = offset
+                if not best: break
+        return [best, best_offset]
+    
+    def Match__Bit_Parallel(self, region):
+        """
+        Return the lowest number of mismatches between the barcode and [region],
+        and the offset at which it occurs, counting the mismatches at all
+        offsets in a single pass over [region].
+        
+        Each field of [state] holds the number of mismatches between a prefix
+        of the barcode and the sequence ending at the current position. Field
+        i is shifted into field i+1 by each new character, so the last field
+        holds the mismatches for the complete barcode.
+        
+        Match__Bit_Parallel(str) -> [int, int]
+        """
+        char_masks = self.char_masks
+        field_bits = self.field_bits
+        state_mask = self.state_mask
+        start = self.length - 1
+        best = self.threshold + 1
+        best_offset = 0
+        state = 0
+        for i in range(len(region)):
+            c = region[i]
+            mask = char_masks.get(c)
+            if mask == None: mask = self.Get_Char_Mask(c)
+            state = ((state << field_bits) + mask) & state_mask
+            if i >= start:
+                mismatches = (state >> self.last_field) & self.field_mask
+                if mismatches < best:
+                    best = mismatches
+                    best_offset = i - start
+                    if not best: break
+        return [best, best_offset]
+    
+    def Match__Weighted(self, seq, qc, result):
+        """
+        Return the lowest total weight of the mismatches between the barcode and
+        [seq], using the quality scores [qc], and the offset at which it occurs.
+        
+        Only offsets whose mismatches could be within the threshold, even if
+        they all had the reduced weight, are scored. Their mismatches are looked
+        up in the weighted index, and the mismatches at bases with a reduced
+        weight are found by combining their positions with those of the bases.
+        
+        [result] is the result of Match__Count, which is returned unchanged if
+        [seq] is too short to contain the whole barcode, or if no offset could
+        be within the threshold. Otherwise, scores of more than the threshold
+        are reported as [threshold]+1, as in Match__Count.
+        
+        In bytes mode, [seq] and [qc] are given as bytes.
+        
+        Match__Weighted(str, str, [int, int]) -> [int/float, int]
+        Match__Weighted(bytes, bytes, [int, int]) -> [int/float, int]
+        """
+        length = self.length
+        weight = self.quality_weight
+        region = seq[:length + self.max_offset]
+        if len(region) < length or len(qc) < len(region): return result
+        if result[0] * weight > self.threshold: return result
+        masks = self.masks
+        if self.bytes_mode:
+            if masks == None or REGEX__non_ACGT_bytes.search(region):
+                return self.Match__Weighted__Bit_Parallel(Bytes_To_Str(region),
+                        Bytes_To_Str(qc), result)
+            region_qc = qc[:len(region)]
+        else:
+            if masks == None or REGEX__non_ACGT.search(region):
+                return self.Match__Weighted__Bit_Parallel(region, qc, result)
+            region_qc = Str_To_Bytes(qc[:len(region)])
+        # Bit i is set if the i-th base of the region has a reduced weight
+        reduced = int(region_qc.translate(self.quality_flags)[::-1], 2)
+        best = self.threshold + 1
+        best_offset = 0
+        for offset in range(len(region) - length + 1):
+            entry = masks.get(region[offset:offset+length])
+            if entry == None: continue # Too many mismatches
+            mismatches, positions = entry
+            low = bin(positions & (reduced >> offset)).count("1")
+            score = (mismatches - low) + low * weight
+            if score < best:
+                best = score
+                best_offset = offset
+                if not best: break
+        return [best, best_offset]
+    
+    def Match__Weighted__Bit_Parallel(self, seq, qc, result):
+        """
+        The bit-parallel version of Match__Weighted, for sequences which are not
+        in the weighted index.
+        
+        Two counts are kept in a single pass over [seq], in the same way as in
+        Match__Bit_Parallel: one of all the mismatches, and one of only the
+        mismatches at bases with a reduced weight.
+        
+        Match__Weighted__Bit_Parallel(str, str, [int, int]) -> [int/float, int]
+        """
+        length = self.length
+        weight = self.quality_weight
+        region = seq[:length + self.max_offset]
+        if len(region) < length or len(qc) < len(region): return result
+        if result[0] * weight > self.threshold: return result
+        floor = self.quality_floor
+        char_masks = self.char_masks
+        field_bits = self.field_bits
+        field_mask = self.field_mask
+        state_mask = self.state_mask
+        last_field = self.last_field
+        start = length - 1
+        best = self.threshold + 1
+        best_offset = 0
+        state = 0
+        state_low = 0 # Mismatches at bases with a reduced weight only
+        for i in range(len(region)):
+            c = region[i]
+            mask = char_masks.get(c)
+            if mask == None: mask = self.Get_Char_Mask(c)
+            state = ((state << field_bits) + mask) & state_mask
+            state_low = (state_low << field_bits) & state_mask
+            if floor == None or qc[i] < floor: state_low += mask
+            if i >= start:
+                mismatches = (state >> last_field) & field_mask
+                if mismatches * weight < best:
+                    low = (state_low >> last_field) & field_mask
+                    score = (mismatches - low) + low * weight
+                    if score < best:
+                        best = score
+                        best_offset = i - start
+                        if not best: break
+        return [best, best_offset]
+    
+    def Get_Char_Mask(self, c):
+        """
+        Return (and cache) the bit fields for a character, with a 1 in field i
+        if the character does not match the i-th nucleotide of the barcode.
+        
+        Get_Char_Mask(str) -> int
+        """
+        mask = 0
+        for i in range(self.length):
+            if NSeq_Match.NSeq_Match(self.barcode[i], c):
+                mask += 1 << (self.field_bits * i)
+        self.char_masks[c] = mask
+        return mask
+
+
+
+class Tail_Matcher:
+    """
+    Finds the position at which the complement of the barcode begins, at the
+    end of an r1 read given as bytes, with the same results as
+    NSeq_Match.Candidate_Match_Position__TAIL, but without decoding the read.
+    
+    Every window at the end of the read which could hold the whole complement
+    is looked up in a neighbourhood index of the complement, and every shorter
+    tail of the read in an index of the starts of the complement. Reads with
+    characters other than A, C, G, and T in those windows are decoded and
+    searched with NSeq_Match instead.
+    
+    As the indexes must give the same results as NSeq_Match, they are checked
+    against it on a set of test sequences when they are built, and are not used
+    if any result differs, or if they would be too large.
+    """
+    def __init__(self, complement, threshold,
+                max_index_entries=CONFIG__INDEX_ENTRIES_MAX):
+        """
+        @complement
+                (str)
+                The complement of the barcode.
+        @threshold
+                (int)
+                The maximum number of mismatches in a window with the whole
+                complement.
+        @max_index_entries
+                (int)
+                The largest neighbourhood index which may be built.
+        """
+        self.complement = complement
+        self.length = len(complement)
+        self.threshold = threshold
+        self.index = None
+        self.starts = None
+        if not self.length: return
+        if Count_Neighbourhood(complement, threshold) > max_index_entries:
+            return
+        self.index = set([Str_To_Bytes(k)
+                for k in Build_Neighbourhood(complement, threshold)])
+        self.starts = set()
+        for i in range(1, self.length):
+            self.starts.update([Str_To_Bytes(k)
+                    for k in Build_Neighbourhood(complement[:i], 0)])
+        if not self.Check(): self.index = self.starts = None
+    
+    def Find(self, seq):
+        """
+        Return the position in [seq] at which the complement begins, or the
+        length of [seq] if it is not found.
+        
+        Find(bytes) -> int
+        """
+        index = self.index
+        length = self.length
+        end = len(seq)
+        start = max(end - 2*length, 0)
+        if index == None or REGEX__non_ACGT_bytes.search(seq, start):
+            return NSeq_Match.Candidate_Match_Position__TAIL(Bytes_To_Str(seq),
+                    self.complement, self.threshold)
+        for pos in range(start, end - length + 1):
+            if seq[pos:pos+length] in index: return pos
+        starts = self.starts
+        for pos in range(max(end - length + 1, 0), end):
+            if seq[pos:] in starts: return pos
+        return end
+    
+    def Check(self):
+        """
+        Return True if Find gives the same results as NSeq_Match for reads of
+        several lengths with the complement, or the start of it, at every
+        position, with no mismatches, [threshold] mismatches, and one more than
+        that. Return False otherwise.
+        
+        Check() -> bool
+        """
+        rng = random.Random(CONFIG__TAIL_CHECK_SEED)
+        length = self.length
+        complement = self.complement
+        mismatched = [[n for n in "ACGT" if n not in allowed][:1]
+                for allowed in Get_Allowed_Nucleotides(complement)]
+        for end in [1, length, length + 1, 2*length, 2*length + 1,
+                3*length + 2]:
+            read = "".join([rng.choice("ACGT") for i in range(end)])
+            for pos in range(end):
+                tail = list(complement[:end - pos])
+                for mismatches in [0, self.threshold, self.threshold + 1]:
+                    test = list(tail)
+                    for i in range(min(mismatches, len(test))):
+                        if mismatched[i]: test[i] = mismatched[i][0]
+                    seq = read[:pos] + "".join(test) + read[pos+len(test):]
+                    expected = NSeq_Match.Candidate_Match_Position__TAIL(seq,
+                            complement, self.threshold)
+                    if self.Find(Str_To_Bytes(seq)) != expected: return False
+        return True
+
+
+
+class Barcode_Matcher_Cache:
+    """
+    Creates Barcode_Matchers, reusing a previously created one with the same
+    settings if possible, so that its index only has to be built once. The
+    cache is safe to share between threads.
+    
+    If a Memory_Governor is given, the total size of the indexes held by the
+    cache is kept within the governor's index budget. Matchers which would take
+    the total over budget are built without an index. The entries are returned
+    to the budget when the cache is cleared.
+    """
+    def __init__(self, governor=None):
+        """
+        @governor
+                (Memory_Governor)
+                (Optional)
+                The Memory_Governor whose index budget limits the indexes.
+        """
+        self.governor = governor
+        self.matchers = {} # By their settings
+        self.entries = 0 # In the indexes held
+        self.lock = threading.Lock()
+    
+    def Get(self, barcode, threshold, max_offset, quality, bytes_mode):
+        """
+        Return a Barcode_Matcher with the specified settings.
+        
+        See Barcode_Matcher for the arguments. [quality] is the Phred quality
+        score cutoff and weight used to build the quality table, if any.
+        
+        Get(str, int, int, [int, int/float], bool) -> Barcode_Matcher
+        """
+        if quality: quality = tuple(quality)
+        key = (barcode, threshold, max_offset, quality, bytes_mode)
+        self.lock.acquire()
+        try:
+            matcher = self.matchers.get(key)
+            if matcher == None:
+                quality_table = None
+                if quality: quality_table = Build_Quality_Table(*quality)
+                max_index_entries = CONFIG__INDEX_ENTRIES_MAX
+                if self.governor:
+                    max_index_entries = (self.governor.index_entries -
+                            self.governor.index_entries_used)
+                matcher = Barcode_Matcher(barcode, threshold, max_offset,
+                        max_index_entries, quality_table, bytes_mode)
+                entries = len(matcher.index or ()) + len(matcher.masks or ())
+                self.entries += entries
+                if self.governor: self.governor.index_entries_used += entries
+                self.matchers[key] = matcher
+        finally:
+            self.lock.release()
+        return matcher
+    
+    def Clear(self):
+        """
+        Drop every Barcode_Matcher held, returning their index entries to the
+        budget of the governor.
+        
+        Clear() -> None
+        """
+        self.lock.acquire()
+        try:
+            if self.governor: self.governor.index_entries_used -= self.entries
+            self.matchers = {}
+            self.entries = 0
+        finally:
+            self.lock.release()
+
+
+
+class N_Content_Filter:
+    """
+    Decides whether read pairs are unreadable, based on the fraction of N bases
+    in their reads.
+    
+    The N bases are counted with str.count, or bytes.count, so that junk read
+    pairs can be removed cheaply before the barcode is searched for.
+    """
+    def __init__(self, max_fraction, window=DEFAULT__n_window,
+                mates=DEFAULT__n_mates, length=0, max_offset=0,
+                bytes_mode=False):
+        """
+        @max_fraction
+                (int/float)
+                The largest fraction, from 0 to 1, of N bases a read may have
+                without being regarded as unreadable.
+        @window
+                (int - N_WINDOW)
+                The part of each read the fraction is calculated over. With
+                N_WINDOW.BARCODE, this is the start of the r2 read, up to
+                [max_offset] plus [length], and the end of the r1 read,
+                [length] long.
+        @mates
+                (int - MATES)
+                Which reads of a read pair must have too many N bases for the
+                read pair to be regarded as unreadable.
+        @length
+                (int)
+                The length of the barcode.
+        @max_offset
+                (int)
+                The maximum barcode offset.
+        @bytes_mode
+                (bool)
+                Whether the sequences will be given as bytes.
+        """
+        self.max_fraction = max_fraction
+        self.mates = mates
+        if window == N_WINDOW.BARCODE:
+            self.window_r1 = slice(-length, None)
+            self.window_r2 = slice(None, max_offset + length)
+        else:
+            self.window_r1 = slice(None)
+            self.window_r2 = slice(None)
+        if bytes_mode: self.N = b"N"
+        else: self.N = "N"
+    
+    def Is_Unreadable(self, r1_seq, r2_seq):
+        """
+        Return True if the read pair has too many N bases, and False otherwise.
+        
+        Is_Unreadable(str, str) -> bool
+        """
+        mates = self.mates
+        if mates != MATES.R2:
+            r1_seq = r1_seq[self.window_r1]
+            too_many = r1_seq.count(self.N) > self.max_fraction * len(r1_seq)
+            if mates == MATES.R1: return too_many
+            if mates == MATES.EITHER and too_many: return True
+            if mates == MATES.BOTH and not too_many: return False
+        r2_seq = r2_seq[self.window_r2]
+        return r2_seq.count(self.N) > self.max_fraction * len(r2_seq)
+
+
+
+class Memory_Governor:
+    """
+    Sizes the read batches and file buffers to fit within a memory budget, and
+    halves the batch size whenever the resident set size (RSS) of the program
+    gets close to the budget.
+    
+    The barcode indexes of every Barcode_Matcher_Cache using the governor share
+    a single budget of [index_entries] entries.
+    """
+    def __init__(self, max_memory, files=8, lanes=1):
+        """
+        @max_memory
+                (int)
+                The memory budget, in bytes.
+        @files
+                (int)
+                The number of open files which will need buffers.
+        @lanes
+                (int)
+                The number of jobs which will be sorted at the same time. The
+                memory given to read batches is divided between them.
+        """
+        self.max_memory = max_memory
+        self.baseline = Get_Current_RSS() or 0
+        available = max_memory - self.baseline
+        if available <= 0:
+            printE(STR__memory_budget_low)
+            available = 0
+        # File buffers
+        buffer_size = int(available * CONFIG__MEMORY_SHARE_BUFFERS)
+        buffer_size = buffer_size // max(files, 1)
+        buffer_size = min(buffer_size, CONFIG__BUFFER_SIZE_MAX)
+        self.buffer_size = max(buffer_size, CONFIG__BUFFER_SIZE_MIN)
+        # Read batches
+        batch_size = int(available * CONFIG__MEMORY_SHARE_BATCHES)
+        batch_size = batch_size // (CONFIG__BYTES_PER_PAIR * lanes)
+        self.batch_size = max(min(batch_size, CONFIG__BATCH_SIZE_MAX), 1)
+        self.initial_batch_size = self.batch_size
+        # Barcode index
+        index_entries = int(available * CONFIG__MEMORY_SHARE_INDEX)
+        index_entries = index_entries // CONFIG__BYTES_PER_INDEX_ENTRY
+        self.index_entries = min(index_entries, CONFIG__INDEX_ENTRIES_MAX)
+        self.index_entries_used = 0 # By all the indexes currently held
+        # Tracking
+        self.shrinks = 0
+    
+    def Update(self):
+        """
+        Check the memory usage, and halve the batch size if the memory usage is
+        close to the budget.
+        
+        Return the batch size to use from now on.
+        
+        Update() -> int
+        """
+        rss = Get_Current_RSS()
+        if rss == None: return self.batch_size
+        if rss > self.max_memory * CONFIG__MEMORY_HIGH_WATER:
+            if self.batch_size > 1:
+                self.batch_size = max(self.batch_size // 2, 1)
+                self.shrinks += 1
+        return self.batch_size
+
+
+
+class Sort_Job:
+    """
+    A pair of FASTQ files to be sorted by a Sorting_Lanes object.
+    
+    Once the job has been sorted, [metrics] holds its Sort_Metrics object, or
+    [error] holds the exception which stopped it.
+    """
+    def __init__(self, paths_in, paths_out, barcode):
+        """
+        @paths_in
+        @paths_out
+        @barcode
+                See Sort_By_R2_Barcode.
+        """
+        self.paths_in = paths_in
+        self.paths_out = paths_out
+        self.barcode = barcode
+        self.metrics = None
+        self.error = None
+        self.done = threading.Event()
+    
+    def Wait(self):
+        """
+        Wait for the job to finish. Return its Sort_Metrics object, or None if
+        the job failed.
+        
+        Wait() -> Sort_Metrics
+        Wait() -> None
+        """
+        self.done.wait()
+        return self.metrics
+
+
+
+class Sorting_Lanes:
+    """
+    A set of worker threads ("lanes"), which sort many Sort_Jobs at the same
+    time, so that the opening, reading, and writing of the files of different
+    jobs are overlapped. All jobs are sorted with the same settings.
+    
+    Jobs are queued with Submit, which returns immediately, unless the queue is
+    full. Each job can then be waited on with Sort_Job.Wait, or all jobs can be
+    waited on with Close.
+    
+    Barcode_Matchers are shared between all jobs which use the same barcode,
+    until the lanes are closed. (See Barcode_Matcher_Cache)
+    """
+    def __init__(self, lanes, settings, write_unreadable=False, governor=None):
+        """
+        @lanes
+                (int)
+                The number of jobs to sort at the same time.
+        @settings
+                (dict<str, ->)
+                The keyword arguments to pass to Sort_Files for every job. (Ex.
+                thresholds, removes, max_offset)
+        @write_unreadable
+                (bool)
+                Whether to write the unreadable read pairs of every job to
+                their own files. The filepaths are generated from the input
+                filepaths.
+        @governor
+                (Memory_Governor)
+                (Optional)
+                A Memory_Governor shared by all jobs. The indexes of all the
+                Barcode_Matchers are counted against its index budget together.
+        """
+        self.settings = settings
+        self.write_unreadable = write_unreadable
+        self.governor = governor
+        self.matchers = Barcode_Matcher_Cache(governor)
+        self.queue = queue.Queue(lanes * CONFIG__QUEUE_DEPTH_PER_LANE)
+        self.threads = []
+        for i in range(lanes):
+            thread = threading.Thread(target=self.Run_Lane)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+    
+    def Submit(self, job):
+        """
+        Queue a Sort_Job to be sorted. Return the job.
+        
+        Submit(Sort_Job) -> Sort_Job
+        """
+        self.queue.put(job)
+        return job
+    
+    def Close(self):
+        """
+        Wait for all queued jobs to finish, stop the lanes, and drop the
+        Barcode_Matchers.
+        
+        Close() -> None
+        """
+        for thread in self.threads: self.queue.put(None)
+        for thread in self.threads: thread.join()
+        self.matchers.Clear()
+    
+    def Run_Lane(self):
+        """
+        Sort queued jobs until told to stop.
+        
+        Run_Lane() -> None
+        """
+        while True:
+            job = self.queue.get()
+            if job == None: return
+            try:
+                paths_unreadable = None
+                if self.write_unreadable:
+                    paths_unreadable = Generate_Default_Unreadable_Paths(
+                            job.paths_in[0], job.paths_in[1])
+                paths_short = None
+                if self.settings.get("min_length"):
+                    paths_short = Generate_Default_Short_Paths(job.paths_in[0],
+                            job.paths_in[1])
+                path_manifest = None
+                if self.settings.get("shards"):
+                    path_manifest = Generate_Default_Manifest_Path(
+                            job.paths_in[0])
+                job.metrics = Sort_Files(job.paths_in, job.paths_out,
+                        job.barcode, paths_unreadable=paths_unreadable,
+                        governor=self.governor, path_manifest=path_manifest,
+                        paths_short=paths_short, matchers=self.matchers,
+                        **self.settings)
+            except Exception as e:
+                job.error = e
+            job.done.set()
+
+
+
+class File_Pair_Sink:
+    """
+    A sink which writes read pairs into a pair of open files, one for the r1
+    reads and one for the r2 reads.
+    """
+    def __init__(self, file_r1, file_r2):
+        self.file_r1 = file_r1
+        self.file_r2 = file_r2
+    
+    def Write(self, r1, r2):
+        """
+        Write a read pair to the r1 and r2 files.
+        
+        Write(list<str>[4], list<str>[4]) -> None
+        """
+        self.file_r1.write(Create_Output(*r1))
+        self.file_r2.write(Create_Output(*r2))
+
+
+
+class Bytes_File_Pair_Sink:
+    """
+    A sink which writes read pairs, as bytes, into a pair of files open in
+    binary mode. For use with the BYTES engine.
+    """
+    def __init__(self, file_r1, file_r2):
+        self.file_r1 = file_r1
+        self.file_r2 = file_r2
+    
+    def Write(self, r1, r2):
+        """
+        Write a read pair to the r1 and r2 files.
+        
+        Write(list<bytes>[4], list<bytes>[4]) -> None
+        """
+        self.file_r1.writelines([r1[0], b"\n", r1[1], b"\n", r1[2], b"\n",
+                r1[3], b"\n"])
+        self.file_r2.writelines([r2[0], b"\n", r2[1], b"\n", r2[2], b"\n",
+                r2[3], b"\n"])
+
+
+
+class Sharded_File_Pair_Sink:
+    """
+    A sink which writes read pairs into a series of numbered pairs of files
+    ("shards"), such as reads_r1__MATCH.0001.fq and reads_r2__MATCH.0001.fq. A
+    new pair of shards is started once the current pair reaches a number of read
+    pairs, or once either shard reaches a size. The r1 and r2 shards are always
+    started together, so every pair of shards holds the same read pairs.
+    
+    The first pair of shards is created straight away, even if no read pairs are
+    ever written to it.
+    """
+    def __init__(self, path_r1, path_r2, max_records=None, max_bytes=None,
+                bytes_mode=False, buffer_size=-1):
+        """
+        @path_r1
+        @path_r2
+                (str - filepath)
+                The filepaths from which the shard filepaths are generated.
+                (See Get_Shard_Path)
+        @max_records
+                (int)
+                (Optional)
+                The maximum number of read pairs per pair of shards.
+        @max_bytes
+                (int)
+                (Optional)
+                The size, in bytes, at which a new pair of shards is started.
+        @bytes_mode
+                (bool)
+                Whether the read pairs will be given as bytes. (BYTES engine)
+        @buffer_size
+                (int)
+                The buffer size for the shard files.
+        """
+        self.paths = [path_r1, path_r2]
+        self.max_records = max_records or float("inf")
+        self.max_bytes = max_bytes or float("inf")
+        self.count_bytes = bool(max_bytes)
+        self.bytes_mode = bytes_mode
+        self.buffer_size = buffer_size
+        self.shards = [] # [path_r1, path_r2, read pairs]
+        self.files = []
+        self.sink = None
+        self.records = 0
+        self.size = 0
+        self.Next_Shard()
+    
+    def Write(self, r1, r2):
+        """
+        Write a read pair to the current pair of shards, starting a new pair of
+        shards first if the current pair is full.
+        
+        Write(list<str>[4], list<str>[4]) -> None
+        """
+        if self.records >= self.max_records or self.size >= self.max_bytes:
+            self.Next_Shard()
+        self.sink.Write(r1, r2)
+        self.records += 1
+        if self.count_bytes:
+            self.size += max(len(r1[0]) + len(r1[1]) + len(r1[2]) + len(r1[3]),
+                    len(r2[0]) + len(r2[1]) + len(r2[2]) + len(r2[3])) + 4
+    
+    def Next_Shard(self):
+        """
+        Close the current pair of shards, if any, and start the next pair.
+        
+        Next_Shard() -> None
+        """
+        self.Close()
+        number = len(self.shards) + 1
+        path_r1 = Get_Shard_Path(self.paths[0], number)
+        path_r2 = Get_Shard_Path(self.paths[1], number)
+        if self.bytes_mode: mode, Sink = "wb", Bytes_File_Pair_Sink
+        else: mode, Sink = "w", File_Pair_Sink
+        self.files = [open(path_r1, mode, self.buffer_size),
+                open(path_r2, mode, self.buffer_size)]
+        self.sink = Sink(self.files[0], self.files[1])
+        self.shards.append([path_r1, path_r2, 0])
+        self.records = 0
+        self.size = 0
+    
+    def Close(self):
+        """
+        Close the current pair of shards.
+        
+        Close() -> None
+        """
+        for f in reversed(self.files): f.close()
+        self.files = []
+        if self.shards: self.shards[-1][2] = self.records
+
+
+
+class Null_Sink:
+    """
+    A sink which discards read pairs.
+    
+    Sort_Reads treats categories routed to a Null_Sink as having no sink at all,
+    so read pairs of those categories are counted, but never trimmed, formatted,
+    or passed to Write.
+    """
+    def Write(self, r1, r2):
+        """
+        Discard a read pair.
+        
+        Write(list<str>[4], list<str>[4]) -> None
+        """
+        pass
+
+
+
+class List_Sink:
+    """
+    A sink which keeps read pairs in memory, as a list of [r1, r2] pairs.
+    """
+    def __init__(self):
+        self.pairs = []
+    
+    def Write(self, r1, r2):
+        """
+        Store a read pair.
+        
+        Write(list<str>[4], list<str>[4]) -> None
+        """
+        self.pairs.append([r1, r2])
 
 
 
 # File Processing Code #########################################################
 
-def Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes):
+def Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes,
+            discards=[], merge_partial=DEFAULT__merge_partial,
+            paths_unreadable=None, max_memory=None,
+            max_offset=DEFAULT__max_offset, quality=None,
+            engine=DEFAULT__engine, validate=DEFAULT__validate, shards=None,
+            path_manifest=None, min_length=None, paths_short=None,
+            path_lengths=None, n_policy=None):
     """
     Function which performs the FASTQ file sorting.
     
+    A file-based wrapper for Sort_Reads, which writes the sorted reads into the
+    output files and prints the metrics.
+    
     @paths_in
             (list<str - filepath>[2])
             The filepaths of the r1 and r2 input files. 
@@ -321,119 +1832,902 @@ def Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes):
             Whether or not to remove the R1 and R2 barcodes, if found.
             The first boolean refers to trimming the R1 sequence.
             The second boolean refers to trimming the R2 sequence.
+    @discards
+            (list<int - CATEGORY>)
+            The categories of read pairs which are to be counted, but not
+            written to file. Discarding every category gives a count-only run.
+    @merge_partial
+            (bool)
+            Whether read pairs with a partial barcode are to be written to the
+            output files for read pairs with a complete barcode.
+    @paths_unreadable
+            (list<str - filepath>[2])
+            (Optional)
+            The filepaths for the r1 and r2 reads of unreadable read pairs.
+            Unreadable read pairs are discarded if this is not specified.
+    @max_memory
+            (int)
+            (Optional)
+            The memory budget, in bytes. If specified, the sizes of the read
+            batches and file buffers are governed by a Memory_Governor.
+    @max_offset
+            (int)
+            The maximum number of nucleotides which may come before the barcode
+            in the r2 reads.
+    @quality
+            (list<int, int/float>[2])
+            (Optional)
+            The Phred quality score below which mismatches are given a reduced
+            weight, and the reduced weight. If specified, the thresholds are
+            applied to the total weight of the mismatches.
+    @engine
+            (int - ENGINE)
+            The engine used to process the reads. ENGINE.STR reads the files
+            as text and processes the reads as strings. ENGINE.BYTES reads the
+            files in binary and processes the reads as bytes.
+    @validate
+            (bool)
+            Whether to check that the r1 and r2 files are in step while they
+            are being sorted. (Matching read counts, read IDs, and sequence and
+            quality score lengths.) A Read_Pair_Error is raised at the first bad
+            read pair, and the output files written so far are deleted.
+    @shards
+            (list<int>[2])
+            (Optional)
+            The maximum number of read pairs, and the size in bytes, at which a
+            new pair of output shards is started. Either may be None. If
+            specified, each pair of output files is written as a series of
+            numbered shards instead. (See Sharded_File_Pair_Sink) Any existing
+            shards of the output files are deleted first.
+    @path_manifest
+            (str - filepath)
+            (Optional)
+            The filepath for the manifest listing every shard and the number
+            of read pairs in it. Only used if [shards] is specified.
+    @min_length
+            (int)
+            (Optional)
+            The minimum length of the r1 and r2 reads, after trimming. Read
+            pairs with a shorter read are moved into CATEGORY.SHORT. Only read
+            pairs of categories which are written to file are checked.
+    @paths_short
+            (list<str - filepath>[2])
+            (Optional)
+            The filepaths for the r1 and r2 reads of short read pairs. Short
+            read pairs are discarded if this is not specified.
+    @path_lengths
+            (str - filepath)
+            (Optional)
+            The filepath for the histograms of the trimmed read lengths of each
+            category of read pairs written to file.
+    @n_policy
+            (list<int/float, int - N_WINDOW, int - MATES>[3])
+            (Optional)
+            The largest fraction of N bases a read may have, the part of the
+            read it is calculated over, and which reads of a read pair must
+            have too many N bases for the read pair to be regarded as
+            unreadable. (See N_Content_Filter) If this is not specified, a read
+            pair is unreadable if both reads begin with a run of Ns.
     
     Return a value of 0 if the function runs successfully.
+    Return a value of 1 if the input files fail validation.
     
     Sort_By_R2_Barcode([str, str], [str, str, str, str, str, str], str, [int,
-            int]) -> int
+            int], [bool, bool], list<int>, bool, [str, str], int, int,
+            [int, int/float], int, bool, [int, int], str, int, [str, str], str,
+            [int/float, int, int]) -> int
     """
     printP(STR__sort_by_r2_bcode_begin)
+    
+    # Memory
+    routing = Get_Output_Routing(paths_out, discards, merge_partial,
+            paths_unreadable, paths_short)
+    governor = None
+    if max_memory:
+        governor = Memory_Governor(max_memory, 2 + 2*len(routing))
+    
+    # Main Loop
+    try:
+        metrics = Sort_Files(paths_in, paths_out, barcode, thresholds, removes,
+                discards, merge_partial, paths_unreadable, governor,
+                max_offset, quality, engine, validate, shards, path_manifest,
+                min_length, paths_short, bool(path_lengths), n_policy)
+    except Read_Pair_Error as e:
+        printE(STR__validation_failed.format(e = e))
+        return 1
+    if path_lengths: Write_Length_Histograms(path_lengths, metrics.lengths)
+    
+    # Metrics Reporting
+    Report_Metrics(metrics, min_length)
+    if governor: Report_Memory_Governor(governor)
+    if shards and path_manifest:
+        printM(STR__metrics_manifest.format(f = path_manifest))
+    if path_lengths: printM(STR__metrics_histogram.format(f = path_lengths))
+    
+    # Exit
+    printP(STR__sort_by_r2_bcode_complete)
+    return 0
+
 
+
+def Sort_Files(paths_in, paths_out, barcode, thresholds, removes, discards=[],
+            merge_partial=DEFAULT__merge_partial, paths_unreadable=None,
+            governor=None, max_offset=DEFAULT__max_offset, quality=None,
+            engine=DEFAULT__engine, validate=DEFAULT__validate, shards=None,
+            path_manifest=None, min_length=None, paths_short=None,
+            lengths=False, n_policy=None, matchers=None):
+    """
+    Sort a pair of FASTQ files into the output files, without printing anything.
+    
+    @governor
+            (Memory_Governor)
+            (Optional)
+            A Memory_Governor which sizes the read batches and file buffers.
+    @lengths
+            (bool)
+            Whether to count the trimmed read lengths into the histograms of
+            the Sort_Metrics object.
+    @matchers
+            (Barcode_Matcher_Cache)
+            (Optional)
+            The cache to take the Barcode_Matcher from. (See
+            Iterate_Sorted_Batches)
+    
+    See Sort_By_R2_Barcode for all other arguments.
+    
+    Return a Sort_Metrics object containing the counters.
+    
+    Sort_Files([str, str], [str, str, str, str, str, str], str, [int, int],
+            [bool, bool], list<int>, bool, [str, str], Memory_Governor, int,
+            [int, int/float], int, bool, [int, int], str, int, [str, str], bool,
+            [int/float, int, int], Barcode_Matcher_Cache) -> Sort_Metrics
+    """
+    routing = Get_Output_Routing(paths_out, discards, merge_partial,
+            paths_unreadable, paths_short)
+    buffer_size = -1 # System default
+    if governor: buffer_size = governor.buffer_size
+    
+    # Initialize File IO
+    if engine == ENGINE.BYTES:
+        mode_read, mode_write, Sink = "rb", "wb", Bytes_File_Pair_Sink
+    else:
+        mode_read, mode_write, Sink = MODE__read, "w", File_Pair_Sink
+    f1 = open(paths_in[0], mode_read, buffer_size)
+    f2 = open(paths_in[1], mode_read, buffer_size)
+    files_out = []
+    sinks = {}
+    for category in LIST__categories:
+        if category not in routing: continue
+        if shards:
+            for path in routing[category]:
+                for path_shard in Find_Shard_Paths(path): os.remove(path_shard)
+            sinks[category] = Sharded_File_Pair_Sink(routing[category][0],
+                    routing[category][1], shards[0], shards[1],
+                    engine == ENGINE.BYTES, buffer_size)
+            files_out.append(sinks[category])
+            continue
+        w1 = open(routing[category][0], mode_write, buffer_size)
+        w2 = open(routing[category][1], mode_write, buffer_size)
+        files_out += [w1, w2]
+        sinks[category] = Sink(w1, w2)
+    if merge_partial and CATEGORY.MATCH in sinks:
+        sinks[CATEGORY.PARTIAL] = sinks[CATEGORY.MATCH]
+    
+    # Main Loop
+    try:
+        try:
+            metrics = Sort_Reads(f1, f2, sinks, barcode, thresholds, removes,
+                    governor=governor, max_offset=max_offset, quality=quality,
+                    engine=engine, validate=validate, min_length=min_length,
+                    lengths=lengths, n_policy=n_policy, matchers=matchers)
+        finally:
+            for w in reversed(files_out):
+                if shards: w.Close()
+                else: w.close()
+            f2.close()
+            f1.close()
+    except Read_Pair_Error:
+        # Don't leave partly sorted outputs behind
+        for w in files_out:
+            if shards:
+                for path_r1, path_r2, records in w.shards:
+                    os.remove(path_r1)
+                    os.remove(path_r2)
+            else: os.remove(w.name)
+        if shards and path_manifest and os.path.exists(path_manifest):
+            os.remove(path_manifest)
+        raise
+    
+    if shards and path_manifest: Write_Shard_Manifest(path_manifest, sinks)
+    
+    return metrics
+
+
+
+def Write_Shard_Manifest(filepath, sinks):
+    """
+    Write a manifest listing every shard written by the Sharded_File_Pair_Sinks
+    in [sinks], along with its category and number of read pairs, as a
+    tab-separated file.
+    
+    Write_Shard_Manifest(str, dict<int - CATEGORY, Sharded_File_Pair_Sink>)
+            -> None
+    """
+    names = dict([(category, name) for name, category in
+            DICT__categories.items()])
+    done = []
+    f = open(filepath, "w")
+    f.write(STR__manifest_header)
+    for category in LIST__categories:
+        sink = sinks.get(category)
+        if sink == None or sink in done: continue
+        done.append(sink)
+        for path_r1, path_r2, records in sink.shards:
+            f.write(STR__manifest_line.format(c = names[category],
+                    f1 = path_r1, f2 = path_r2, n = records))
+    f.close()
+
+
+
+def Sort_Jobs_By_R2_Barcode(jobs, thresholds, removes, discards=[],
+            merge_partial=DEFAULT__merge_partial,
+            write_unreadable=DEFAULT__write_unreadable, max_memory=None,
+            max_offset=DEFAULT__max_offset, quality=None,
+            engine=DEFAULT__engine, lanes=DEFAULT__lanes,
+            validate=DEFAULT__validate, shards=None, min_length=None,
+            path_lengths=None, n_policy=None):
+    """
+    Sort many pairs of FASTQ files, several at a time, and print the combined
+    metrics and the throughput of the whole set of jobs.
+    
+    @jobs
+            (list<Sort_Job>)
+            The pairs of files to sort.
+    @write_unreadable
+            (bool)
+            Whether to write the unreadable read pairs of every job to their
+            own files. The filepaths are generated from the input filepaths.
+    @lanes
+            (int)
+            The number of jobs to sort at the same time.
+    @shards
+            See Sort_By_R2_Barcode. The manifest filepath of every job is
+            generated from its r1 input filepath.
+    @min_length
+            See Sort_By_R2_Barcode. The filepaths for the short read pairs of
+            every job are generated from its input filepaths.
+    @path_lengths
+            (str - filepath)
+            (Optional)
+            The filepath for the histograms of the trimmed read lengths of all
+            the jobs combined.
+    
+    See Sort_By_R2_Barcode for all other arguments.
+    
+    Return a value of 0 if every job was sorted successfully, and 1 otherwise.
+    No jobs are sorted if any two jobs would write the same file, or if a job
+    would write over an input file. (See Find_Job_Path_Collision)
+    
+    Sort_Jobs_By_R2_Barcode(list<Sort_Job>, [int, int], [bool, bool],
+            list<int>, bool, bool, int, int, [int, int/float], int, int, bool,
+            [int, int], int, str, [int/float, int, int]) -> int
+    """
+    path = Find_Job_Path_Collision(jobs, discards, merge_partial,
+            write_unreadable, min_length, shards, path_lengths)
+    if path:
+        printE(STR__jobs_collision.format(f = path))
+        return 1
+    printP(STR__sort_jobs_begin.format(n = len(jobs), l = lanes))
+    
+    # Memory
+    governor = None
+    if max_memory:
+        files_per_job = 2 + 2*len(Get_Output_Routing([None]*6, discards,
+                merge_partial, write_unreadable and [None, None],
+                min_length and [None, None]))
+        governor = Memory_Governor(max_memory, files_per_job * lanes, lanes)
+    
+    # Main Loop
+    settings = {
+            "thresholds": thresholds,
+            "removes": removes,
+            "discards": discards,
+            "merge_partial": merge_partial,
+            "max_offset": max_offset,
+            "quality": quality,
+            "engine": engine,
+            "validate": validate,
+            "shards": shards,
+            "min_length": min_length,
+            "lengths": bool(path_lengths),
+            "n_policy": n_policy}
+    start = time.time()
+    runner = Sorting_Lanes(lanes, settings, write_unreadable, governor)
+    for job in jobs: runner.Submit(job)
+    runner.Close()
+    elapsed = time.time() - start
+    
+    # Combine
+    metrics = Sort_Metrics()
+    failed = 0
+    for job in jobs:
+        if job.metrics: metrics.Add(job.metrics)
+        else:
+            failed += 1
+            printE(STR__job_failed.format(f1 = job.paths_in[0],
+                    f2 = job.paths_in[1], e = job.error))
+    metrics.peak_rss = Get_Peak_RSS()
+    if path_lengths: Write_Length_Histograms(path_lengths, metrics.lengths)
+    
+    # Metrics Reporting
+    Report_Metrics(metrics, min_length)
+    if governor: Report_Memory_Governor(governor)
+    if path_lengths: printM(STR__metrics_histogram.format(f = path_lengths))
+    printM(STR__metrics_jobs.format(s = len(jobs)))
+    printM(STR__metrics_jobs_failed.format(s = failed))
+    printM(STR__metrics_time.format(s = "%.2f" % elapsed))
+    printM(STR__metrics_throughput.format(s = "%.0f" % (metrics.count_total /
+            max(elapsed, 1e-9))))
+    
+    # Exit
+    if failed: return 1
+    printP(STR__sort_by_r2_bcode_complete)
+    return 0
+
+
+
+def Get_Output_Routing(paths_out, discards, merge_partial, paths_unreadable,
+            paths_short=None):
+    """
+    Determine which output files need to be created, for each category of read
+    pair.
+    
+    @paths_out
+    @discards
+    @merge_partial
+    @paths_unreadable
+    @paths_short
+            See Sort_By_R2_Barcode.
+    
+    Return a dictionary of the r1 and r2 output filepaths for every category of
+    read pair which is to be written to its own pair of files. Categories which
+    are discarded, or merged into another category, are absent.
+    
+    Get_Output_Routing(list<str>[6], list<int>, bool, [str, str], [str, str])
+            -> dict<int - CATEGORY, [str, str]>
+    """
+    routing = {
+            CATEGORY.MATCH: paths_out[0:2],
+            CATEGORY.PARTIAL: paths_out[2:4],
+            CATEGORY.ABSENT: paths_out[4:6]}
+    if paths_unreadable: routing[CATEGORY.UNREADABLE] = paths_unreadable
+    if paths_short: routing[CATEGORY.SHORT] = paths_short
+    if merge_partial: routing.pop(CATEGORY.PARTIAL)
+    for category in discards:
+        if category in routing: routing.pop(category)
+    return routing
+
+
+
+def Sort_Reads(file_r1, file_r2, sinks, barcode, thresholds, removes,
+            batch_size=DEFAULT__batch_size, governor=None,
+            max_offset=DEFAULT__max_offset, quality=None, engine=ENGINE.STR,
+            validate=DEFAULT__validate, min_length=None, lengths=False,
+            n_policy=None, matchers=None):
+    """
+    Sort the read pairs from two open FASTQ files, passing each pair to the sink
+    for its category.
+    
+    @file_r1
+            (file)
+            An open file, or file-like object, of r1 reads.
+    @file_r2
+            (file)
+            An open file, or file-like object, of r2 reads.
+    @sinks
+            (dict<int - CATEGORY, sink>)
+            The sinks to which read pairs of each category are passed. A sink is
+            any object with a Write(r1, r2) method. The same sink may be used
+            for more than one category. Read pairs of a category with no sink,
+            or with a Null_Sink, are counted but otherwise discarded. If every
+            sink is a File_Pair_Sink (or a Bytes_File_Pair_Sink, with the BYTES
+            engine) and the read pairs are not validated, the read pairs are
+            written straight into the sinks' files instead of in batches.
+    @barcode
+    @thresholds
+    @removes
+            See Sort_By_R2_Barcode.
+    @batch_size
+            (int)
+            The number of read pairs to process at a time.
+    @governor
+            (Memory_Governor)
+            (Optional)
+            If specified, the batch size is taken from, and adjusted by, this
+            Memory_Governor instead.
+    @max_offset
+    @quality
+    @engine
+            See Sort_By_R2_Barcode. With the BYTES engine, the files must be
+            open in binary mode, and the sinks will be given bytes.
+    @validate
+            See Sort_By_R2_Barcode. Each batch is validated before any of its
+            read pairs are passed to the sinks.
+    @min_length
+            See Sort_By_R2_Barcode.
+    @lengths
+            See Sort_Files.
+    @n_policy
+            See Sort_By_R2_Barcode.
+    @matchers
+            See Iterate_Sorted_Batches.
+    
+    Return a Sort_Metrics object containing the counters.
+    
+    Sort_Reads(file, file, dict<int, sink>, str, [int, int], [bool, bool], int,
+            Memory_Governor, int, [int, int/float], int, bool, int, bool,
+            [int/float, int, int], Barcode_Matcher_Cache) -> Sort_Metrics
+    """
+    metrics = Sort_Metrics()
+    sinks = dict([(category, sink) for category, sink in sinks.items()
+            if sink is not None and not isinstance(sink, Null_Sink)])
+    # Plain file sinks are written to directly, unless the read pairs have to
+    # be validated in batches first
+    files = None
+    if engine == ENGINE.BYTES: Sink = Bytes_File_Pair_Sink
+    else: Sink = File_Pair_Sink
+    if not validate and sinks and \
+            not [s for s in sinks.values() if s.__class__ is not Sink]:
+        files = dict([(category, [sink.file_r1, sink.file_r2])
+                for category, sink in sinks.items()])
+    for batch in Iterate_Sorted_Batches(file_r1, file_r2, barcode, thresholds,
+            removes, metrics, batch_size, list(sinks.keys()), governor,
+            max_offset, quality, engine, validate, min_length, lengths,
+            n_policy, matchers, files):
+        for category, r1, r2 in batch:
+            sinks[category].Write(r1, r2)
+    metrics.peak_rss = Get_Peak_RSS()
+    return metrics
+
+
+
+def Iterate_Sorted_Batches(file_r1, file_r2, barcode, thresholds, removes,
+            metrics=None, batch_size=DEFAULT__batch_size, categories=None,
+            governor=None, max_offset=DEFAULT__max_offset, quality=None,
+            engine=ENGINE.STR, validate=DEFAULT__validate, min_length=None,
+            lengths=False, n_policy=None, matchers=None, files=None):
+    """
+    A generator which sorts the read pairs from two open FASTQ files and yields
+    them in batches. Each batch is a list of (category, r1, r2) tuples, where
+    the category is a CATEGORY value and r1 and r2 are the (trimmed) reads, in
+    the format returned by Parse_Read.
+    
+    Unreadable read pairs are yielded as well, under CATEGORY.UNREADABLE.
+    
+    With the BYTES engine, the files must be open in binary mode, and the reads
+    are yielded as bytes.
+    
+    @file_r1
+    @file_r2
+            See Sort_Reads.
+    @barcode
+    @thresholds
+    @removes
+            See Sort_By_R2_Barcode.
+    @metrics
+            (Sort_Metrics)
+            (Optional)
+            A Sort_Metrics object which will have its counters updated as read
+            pairs are sorted.
+    @batch_size
+            (int)
+            The maximum number of read pairs per batch.
+    @categories
+            (list<int - CATEGORY>)
+            (Optional)
+            The categories of read pairs to be yielded. Read pairs of other
+            categories are counted, but not trimmed or yielded. All categories
+            are yielded if this is not specified.
+    @governor
+            (Memory_Governor)
+            (Optional)
+            If specified, the batch size is taken from, and adjusted by, this
+            Memory_Governor instead. The size of the barcode index is also
+            limited by it.
+    @max_offset
+    @quality
+    @engine
+            See Sort_By_R2_Barcode.
+    @validate
+            See Sort_By_R2_Barcode. The read pairs are validated in batches,
+            and always before they are yielded.
+    @min_length
+            See Sort_By_R2_Barcode. Only read pairs of the categories to be
+            yielded are checked.
+    @lengths
+            (bool)
+            Whether to count the trimmed read lengths of the read pairs of the
+            categories to be yielded into the histograms of [metrics].
+    @n_policy
+            See Sort_By_R2_Barcode. Unreadable read pairs are found before the
+            barcode is searched for.
+    @matchers
+            (Barcode_Matcher_Cache)
+            (Optional)
+            The cache to take the Barcode_Matcher from. It should use the same
+            Memory_Governor, if any. If it is not specified, a new
+            Barcode_Matcher is created.
+    @files
+            (dict<int - CATEGORY, [file, file]>)
+            (Optional)
+            Open r1 and r2 files for each category of read pairs to be yielded.
+            If specified, the read pairs are written straight into these files
+            as they are sorted, one at a time, and nothing is yielded. Cannot be
+            used with [validate].
+    
+    Iterate_Sorted_Batches(file, file, str, [int, int], [bool, bool],
+            Sort_Metrics, int, list<int>, Memory_Governor, int,
+            [int, int/float], int, bool, int, bool, [int/float, int, int],
+            Barcode_Matcher_Cache, dict<int, [file, file]>) ->
+            generator<list<(int, list<str>[4], list<str>[4])>>
+    """
+    if metrics == None: metrics = Sort_Metrics()
+    if governor: batch_size = governor.batch_size
+    if categories == None: categories = LIST__categories
+    categories = set(categories)
+    
     # Unpack
     threshold_match, threshold_partial = thresholds
     remove_r1, remove_r2 = removes
     
-    # Initialize File IO
-    f1 = open(paths_in[0], "U")
-    f2 = open(paths_in[1], "U")
-    w1 = open(paths_out[0], "w")
-    w2 = open(paths_out[1], "w")
-    w3 = open(paths_out[2], "w")
-    w4 = open(paths_out[3], "w")
-    w5 = open(paths_out[4], "w")
-    w6 = open(paths_out[5], "w")
-    
-    # Initialize Metrics
-    count_total = 0
-    count_NNN = 0
-    count_match = 0
-    count_partial = 0
-    count_absent = 0
-    
     # Preparatory Calculations
     length = len(barcode)
     complement = NSeq_Match.Get_Complement(barcode)
+    cache = matchers or Barcode_Matcher_Cache(governor)
+    matcher = cache.Get(barcode, max(threshold_match, threshold_partial),
+            max_offset, quality, engine == ENGINE.BYTES)
+    if not matchers: cache.Clear() # Only this index is held, while sorting
+    # With no offsets, quality weighting, or index, the barcode is compared to
+    # the start of each r2 read directly, as Barcode_Matcher would
+    bytes_mode = engine == ENGINE.BYTES
+    direct = not max_offset and not quality and not bytes_mode
+    if engine == ENGINE.BYTES:
+        parse = Parse_Read__Bytes
+        n_spam_seq = BYTES__N_SPAM_SEQ
+        symbols = [b" ", b"/", b"/1", b"/2", b"_R1", b"_R2"]
+    else:
+        parse = Parse_Read
+        n_spam_seq = SEQ__N_SPAM_SEQ
+        symbols = [" ", "/", "/1", "/2", "_R1", "_R2"]
+    tail_matchers = {}
+    if engine == ENGINE.BYTES and remove_r1:
+        for threshold in set(thresholds):
+            tail_matchers[threshold] = Tail_Matcher(complement, threshold)
+    offsets = metrics.offsets
+    offsets.extend([0] * (max_offset + 1 - len(offsets)))
+    length_counts = metrics.lengths
+    n_filter = None
+    if n_policy:
+        n_filter = N_Content_Filter(n_policy[0], n_policy[1], n_policy[2],
+                length, max_offset, engine == ENGINE.BYTES)
+    batch = []
+    pending = [] # Read pairs not yet validated
+    count_start = metrics.count_total
     
     # Main Loop
-    r1_ID, r1_seq, r1_3rd, r1_qc = Parse_Read(f1)
-    r2_ID, r2_seq, r2_3rd, r2_qc = Parse_Read(f2)
-
+    r1_ID, r1_seq, r1_3rd, r1_qc = parse(file_r1)
+    r2_ID, r2_seq, r2_3rd, r2_qc = parse(file_r2)
+    
     while r1_seq and r2_seq:
-        count_total += 1
+        metrics.count_total += 1
+        threshold = None
+        
+        # Memory
+        if governor and not metrics.count_total % CONFIG__MEMORY_CHECK_INTERVAL:
+            batch_size = governor.Update()
+        
+        # Validation
+        if validate:
+            pending.append((r1_ID, r1_seq, r1_qc, r2_ID, r2_seq, r2_qc))
+            if len(pending) >= batch_size:
+                Validate_Read_Pairs(pending, metrics.count_total - count_start
+                        - len(pending), symbols)
+                pending = []
         
         # Unreadable
-        subseq1 = r1_seq[:CONFIG__N_SPAM_CUTOFF]
-        subseq2 = r2_seq[:CONFIG__N_SPAM_CUTOFF]
-        if SEQ__N_SPAM_SEQ == subseq1 == subseq2: count_NNN += 1
+        if n_filter: unreadable = n_filter.Is_Unreadable(r1_seq, r2_seq)
+        else: unreadable = (r1_seq.startswith(n_spam_seq) and
+                r2_seq.startswith(n_spam_seq))
+        if unreadable:
+            metrics.count_NNN += 1
+            category = CATEGORY.UNREADABLE
         
         else: # Not unreadable
-            subseq = r2_seq[:length]
-            mismatches = NSeq_Match.NSeq_Match(barcode, subseq)
-            
-            output_file_1 = None
-            output_file_2 = None
+            if direct:
+                mismatches = NSeq_Match.NSeq_Match(barcode, r2_seq[:length])
+                offset = 0
+            else: mismatches, offset = matcher.Match(r2_seq, r2_qc)
             
             # Match
             if mismatches <= threshold_match:
-                count_match += 1
-                # Remove
-                if remove_r1:
-                    pos = NSeq_Match.Candidate_Match_Position__TAIL(r1_seq,
-                            complement, threshold_match)
-                    r1_seq = r1_seq[:pos]
-                    r1_qc = r1_qc[:pos]
-                if remove_r2:
-                    r2_seq = r2_seq[length:]
-                    r2_qc = r2_qc[length:]
-                # Target
-                output_file_1 = w1
-                output_file_2 = w2
+                metrics.count_match += 1
+                offsets[offset] += 1
+                category = CATEGORY.MATCH
+                threshold = threshold_match
             
             # Partial
             elif mismatches <= threshold_partial:
-                count_partial += 1
-                # Remove
+                metrics.count_partial += 1
+                offsets[offset] += 1
+                category = CATEGORY.PARTIAL
+                threshold = threshold_partial
+            
+            # Absent
+            else:
+                metrics.count_absent += 1
+                category = CATEGORY.ABSENT
+        
+        if category in categories:
+            # Remove
+            if threshold != None:
                 if remove_r1:
-                    pos = NSeq_Match.Candidate_Match_Position__TAIL(r1_seq,
-                            complement, threshold_partial)
+                    if tail_matchers:
+                        pos = tail_matchers[threshold].Find(r1_seq)
+                    else:
+                        pos = NSeq_Match.Candidate_Match_Position__TAIL(r1_seq,
+                                complement, threshold)
                     r1_seq = r1_seq[:pos]
                     r1_qc = r1_qc[:pos]
                 if remove_r2:
-                    r2_seq = r2_seq[length:]
-                    r2_qc = r2_qc[length:]
-                # Target
-                output_file_1 = w3
-                output_file_2 = w4
+                    r2_seq = r2_seq[offset+length:]
+                    r2_qc = r2_qc[offset+length:]
             
-            # Absent
-            else:
-                count_absent += 1
-                # Target
-                output_file_1 = w5
-                output_file_2 = w6
+            # Short
+            if min_length and category != CATEGORY.UNREADABLE and (
+                    len(r1_seq) < min_length or len(r2_seq) < min_length):
+                metrics.count_short += 1
+                category = CATEGORY.SHORT
             
-            # Build strings and write
-            string1 = Create_Output(r1_ID, r1_seq, r1_3rd, r1_qc)
-            string2 = Create_Output(r2_ID, r2_seq, r2_3rd, r2_qc)
-            output_file_1.write(string1)
-            output_file_2.write(string2)
+            # Lengths (Short read pairs may not be yielded)
+            if lengths and category in categories:
+                r1_counts, r2_counts = length_counts[category]
+                length_r1 = len(r1_seq)
+                length_r2 = len(r2_seq)
+                if length_r1 >= len(r1_counts) or length_r2 >= len(r2_counts):
+                    r1_counts.extend([0] * (length_r1 + 1 - len(r1_counts)))
+                    r2_counts.extend([0] * (length_r2 + 1 - len(r2_counts)))
+                r1_counts[length_r1] += 1
+                r2_counts[length_r2] += 1
+        
+        if files and category in categories:
+            # Write
+            w1, w2 = files[category]
+            if bytes_mode:
+                w1.writelines([r1_ID, b"\n", r1_seq, b"\n", r1_3rd, b"\n",
+                        r1_qc, b"\n"])
+                w2.writelines([r2_ID, b"\n", r2_seq, b"\n", r2_3rd, b"\n",
+                        r2_qc, b"\n"])
+            else:
+                w1.write(Create_Output(r1_ID, r1_seq, r1_3rd, r1_qc))
+                w2.write(Create_Output(r2_ID, r2_seq, r2_3rd, r2_qc))
+        
+        elif category in categories:
+            # Batch
+            batch.append((category, [r1_ID, r1_seq, r1_3rd, r1_qc],
+                    [r2_ID, r2_seq, r2_3rd, r2_qc]))
+            if len(batch) >= batch_size:
+                if pending:
+                    Validate_Read_Pairs(pending, metrics.count_total -
+                            count_start - len(pending), symbols)
+                    pending = []
+                yield batch
+                batch = []
         
         # Read next
-        r1_ID, r1_seq, r1_3rd, r1_qc = Parse_Read(f1)
-        r2_ID, r2_seq, r2_3rd, r2_qc = Parse_Read(f2)
-    
-    # Finish
-    w6.close()
-    w5.close()
-    w4.close()
-    w3.close()
-    w2.close()
-    w1.close()
-    f2.close()
-    f1.close()
+        r1_ID, r1_seq, r1_3rd, r1_qc = parse(file_r1)
+        r2_ID, r2_seq, r2_3rd, r2_qc = parse(file_r2)
+    
+    # Final validation
+    if validate:
+        number = metrics.count_total - count_start
+        Validate_Read_Pairs(pending, number - len(pending), symbols)
+        if r1_ID and r2_ID:
+            raise Read_Pair_Error(number + 1, STR__validation_empty.format(
+                    n = number + 1))
+        if r1_ID or r2_ID:
+            raise Read_Pair_Error(number + 1, STR__validation_count.format(
+                    n = number + 1, r = ["r2", "r1"][bool(r1_ID)]))
+    
+    # Final batch
+    if batch: yield batch
+
+
+
+def Validate_Read_Pairs(pairs, number, symbols):
+    """
+    Check that the read pairs in [pairs] belong together. Raise a
+    Read_Pair_Error at the first read pair whose IDs do not match, or which has
+    a read with a different number of bases and quality scores.
+    
+    The IDs of a read pair are compared up to the first space or "/". IDs which
+    then only differ by ending in "_R1" in the r1 ID and "_R2" in the r2 ID (Ex.
+    "ID_R1" and "ID_R2", or "ID_r1" and "ID_r2") are also regarded as matching.
+    
+    @pairs
+            (list<(str, str, str, str, str, str)>)
+            The read pairs, each as a tuple of the r1 ID, sequence, and quality
+            scores, followed by the r2 ID, sequence, and quality scores.
+    @number
+            (int)
+            The number of read pairs which came before [pairs].
+    @symbols
+            (list<str>[6])
+            A space, "/", "/1", "/2", "_R1", and "_R2", of the same type as the
+            reads. (str or bytes)
+    
+    Validate_Read_Pairs(list<(str, str, str, str, str, str)>, int, list<str>)
+            -> None
+    """
+    if not pairs: return
+    space, slash, mate_1, mate_2, suffix_1, suffix_2 = symbols
+    count = len(pairs)
+    
+    # Whole batch
+    r1_IDs, r1_seqs, r1_qcs, r2_IDs, r2_seqs, r2_qcs = zip(*pairs)
+    if (list(map(len, r1_seqs)) == list(map(len, r1_qcs)) and
+            list(map(len, r2_seqs)) == list(map(len, r2_qcs))):
+        if r1_IDs == r2_IDs: return
+        # IDs ending in "/1" and "/2"
+        if (list(map(GET__mate, r1_IDs)) == [mate_1] * count and
+                list(map(GET__mate, r2_IDs)) == [mate_2] * count and
+                list(map(GET__stem, r1_IDs)) == list(map(GET__stem, r2_IDs))):
+            return
+        # Names, up to the first space or "/"
+        split_space = operator.methodcaller("split", space, 1)
+        split_slash = operator.methodcaller("split", slash, 1)
+        names_1 = list(map(GET__first, map(split_slash, map(GET__first,
+                map(split_space, r1_IDs)))))
+        names_2 = list(map(GET__first, map(split_slash, map(GET__first,
+                map(split_space, r2_IDs)))))
+        if names_1 == names_2: return
+        upper = operator.methodcaller("upper")
+        if (list(map(upper, map(GET__mate_R, names_1))) == [suffix_1] * count
+                and list(map(upper, map(GET__mate_R, names_2))) ==
+                [suffix_2] * count and
+                list(map(GET__stem_R, names_1)) ==
+                list(map(GET__stem_R, names_2))):
+            return
+    
+    # Find the first bad read pair
+    for r1_ID, r1_seq, r1_qc, r2_ID, r2_seq, r2_qc in pairs:
+        number += 1
+        if len(r1_seq) != len(r1_qc):
+            raise Read_Pair_Error(number, STR__validation_lengths.format(
+                    n = number, r = "r1"))
+        if len(r2_seq) != len(r2_qc):
+            raise Read_Pair_Error(number, STR__validation_lengths.format(
+                    n = number, r = "r2"))
+        if r1_ID != r2_ID:
+            name_1 = r1_ID.split(space, 1)[0].split(slash, 1)[0]
+            name_2 = r2_ID.split(space, 1)[0].split(slash, 1)[0]
+            if name_1 != name_2 and not (name_1[:-3] == name_2[:-3] and
+                    name_1[-3:].upper() == suffix_1 and
+                    name_2[-3:].upper() == suffix_2):
+                if not isinstance(r1_ID, str):
+                    r1_ID, r2_ID = Bytes_To_Str(r1_ID), Bytes_To_Str(r2_ID)
+                raise Read_Pair_Error(number, STR__validation_IDs.format(
+                        n = number, s1 = r1_ID, s2 = r2_ID))
+
+
+
+def Count_Neighbourhood(barcode, threshold):
+    """
+    Return the number of ACGT sequences of the same length as [barcode] which
+    have no more than [threshold] mismatches with it.
+    
+    Count_Neighbourhood(str, int) -> int
+    """
+    counts = [1] + [0] * threshold # Sequences with exactly N mismatches
+    for allowed in Get_Allowed_Nucleotides(barcode):
+        matches = len(allowed)
+        mismatches = 4 - matches
+        for n in range(threshold, 0, -1):
+            counts[n] = counts[n] * matches + counts[n-1] * mismatches
+        counts[0] = counts[0] * matches
+    return sum(counts)
+
+def Build_Neighbourhood(barcode, threshold):
+    """
+    Return a dictionary of every ACGT sequence of the same length as [barcode]
+    which has no more than [threshold] mismatches with it, and the number of
+    mismatches.
+    
+    Build_Neighbourhood(str, int) -> dict<str, int>
+    """
+    entries = {"": 0}
+    for allowed in Get_Allowed_Nucleotides(barcode):
+        new = {}
+        for prefix, mismatches in entries.items():
+            for n in "ACGT":
+                if n in allowed: new[prefix + n] = mismatches
+                elif mismatches < threshold: new[prefix + n] = mismatches + 1
+        entries = new
+    return entries
+
+def Build_Neighbourhood__Masks(barcode, threshold):
+    """
+    Return a dictionary of every ACGT sequence of the same length as [barcode]
+    which has no more than [threshold] mismatches with it, and the number of
+    mismatches and their positions, as an integer with bit i set if the i-th
+    nucleotide is a mismatch.
+    
+    Build_Neighbourhood__Masks(str, int) -> dict<str, (int, int)>
+    """
+    entries = {"": (0, 0)}
+    bit = 1
+    for allowed in Get_Allowed_Nucleotides(barcode):
+        new = {}
+        for prefix, (mismatches, positions) in entries.items():
+            for n in "ACGT":
+                if n in allowed: new[prefix + n] = (mismatches, positions)
+                elif mismatches < threshold:
+                    new[prefix + n] = (mismatches + 1, positions | bit)
+        entries = new
+        bit <<= 1
+    return entries
+
+def Get_Allowed_Nucleotides(barcode):
+    """
+    Return, for each position in [barcode], a string of the nucleotides (A, C,
+    G, or T) which match the nucleotide at that position, according to
+    NSeq_Match.
+    
+    Get_Allowed_Nucleotides(str) -> list<str>
+    """
+    result = []
+    for c in barcode:
+        result.append("".join([n for n in "ACGT"
+                if not NSeq_Match.NSeq_Match(c, n)]))
+    return result
 
-    # Metrics Reporting
-    count_usable = count_total - count_NNN
+
+
+def Build_Quality_Table(cutoff, weight):
+    """
+    Return a lookup table of the weight of a mismatch at a base, for each of
+    the 256 possible quality score characters.
+    
+    @cutoff
+            (int)
+            The Phred quality score below which mismatches are given a reduced
+            weight.
+    @weight
+            (int/float)
+            The reduced weight.
+    
+    Build_Quality_Table(int, int/float) -> list<int/float>[256]
+    """
+    table = []
+    for i in range(256):
+        if i - CONFIG__PHRED_OFFSET < cutoff: table.append(weight)
+        else: table.append(1)
+    return table
+
+
+
+def Report_Metrics(metrics, min_length=None):
+    """
+    Print the counters of a Sort_Metrics object. The number of short read pairs
+    is only printed if [min_length] is specified.
+    
+    Report_Metrics(Sort_Metrics, int) -> None
+    """
+    count_total = metrics.count_total
+    count_NNN = metrics.count_NNN
+    count_match = metrics.count_match
+    count_partial = metrics.count_partial
+    count_absent = metrics.count_absent
+    count_usable = metrics.Get_Usable()
     
     strings = Ints_To_Aligned_Strings([count_total, count_usable, count_NNN,
             count_match, count_partial, count_absent], ALIGN.RIGHT)
@@ -454,10 +2748,142 @@ def Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes):
             p2 = p2_partial))
     printM(STR__metrics_absents.format(s = s_absent, p1 = p1_absent,
             p2 = p2_absent))
+    if min_length:
+        count_short = metrics.count_short
+        s_short = Ints_To_Aligned_Strings([count_short, count_total],
+                ALIGN.RIGHT)[0]
+        p1_short = Get_Percentage_String(count_short, count_usable, 2, 6)
+        p2_short = Get_Percentage_String(count_short, count_total, 2, 6)
+        printM(STR__metrics_shorts.format(s = s_short, p1 = p1_short,
+                p2 = p2_short))
+    if len(metrics.offsets) > 1:
+        Report_Offsets(metrics.offsets)
+    if metrics.peak_rss != None:
+        printM(STR__metrics_peak_rss.format(s = Bytes_To_MB_String(
+                metrics.peak_rss)))
+
+
+
+def Write_Length_Histograms(filepath, length_counts):
+    """
+    Write the histograms of the r1 and r2 read lengths of each category of read
+    pairs as a table of tab-separated values, with a row for every length and a
+    column for every histogram. Categories with no read pairs are left out.
     
-    # Exit
-    printP(STR__sort_by_r2_bcode_complete)
-    return 0
+    @length_counts
+            (list<list<int>[2]>)
+            The r1 and r2 read length histograms, by category. (See
+            Sort_Metrics)
+    
+    Write_Length_Histograms(str, list<list<int>[2]>) -> None
+    """
+    names = dict([(category, name) for name, category in
+            DICT__categories.items()])
+    headers = [STR__histogram_length]
+    columns = []
+    for category in LIST__categories:
+        r1_counts, r2_counts = length_counts[category]
+        if not sum(r1_counts): continue
+        headers.append(STR__histogram_column.format(c = names[category], r = 1))
+        headers.append(STR__histogram_column.format(c = names[category], r = 2))
+        columns += [r1_counts, r2_counts]
+    size = 0
+    for counts in columns:
+        for i in range(len(counts)):
+            if counts[i]: size = max(size, i + 1)
+    f = open(filepath, "w")
+    f.write("\t".join(headers) + "\n")
+    for i in range(size):
+        row = [str(i)]
+        for counts in columns:
+            if i < len(counts): row.append(str(counts[i]))
+            else: row.append("0")
+        f.write("\t".join(row) + "\n")
+    f.close()
+
+
+
+def Report_Offsets(offsets):
+    """
+    Print a histogram of the offsets at which barcodes were found.
+    
+    Report_Offsets(list<int>) -> None
+    """
+    printM(STR__metrics_offsets)
+    labels = Ints_To_Aligned_Strings(list(range(len(offsets))), ALIGN.RIGHT)
+    counts = Ints_To_Aligned_Strings(offsets, ALIGN.RIGHT)
+    percentages = Get_Percentage_Strings(offsets, sum(offsets), 2, 6)
+    for label, count, percentage in zip(labels, counts, percentages):
+        printM(STR__metrics_offset.format(o = label, s = count, p = percentage))
+
+
+
+def Report_Memory_Governor(governor):
+    """
+    Print the memory budget and the final sizing decisions of a Memory_Governor.
+    
+    Report_Memory_Governor(Memory_Governor) -> None
+    """
+    printM(STR__metrics_memory_budget.format(s = Bytes_To_MB_String(
+            governor.max_memory)))
+    printM(STR__metrics_batch_size.format(s = governor.batch_size,
+            i = governor.initial_batch_size, n = governor.shrinks))
+    printM(STR__metrics_buffer_size.format(s = governor.buffer_size))
+    printM(STR__metrics_index_size.format(s = governor.index_entries))
+
+
+
+def Add_Counts(counts, other):
+    """
+    Add the counters in [other] to the counters in [counts], extending [counts]
+    if [other] is longer.
+    
+    Add_Counts(list<int>, list<int>) -> None
+    """
+    counts.extend([0] * (len(other) - len(counts)))
+    for i in range(len(other)):
+        counts[i] += other[i]
+
+
+
+def Get_Current_RSS():
+    """
+    Return the current resident set size of this process, in bytes.
+    
+    Return None if this cannot be determined on this operating system.
+    
+    Get_Current_RSS() -> int
+    Get_Current_RSS() -> None
+    """
+    try:
+        f = open("/proc/self/statm")
+        fields = f.read().split()
+        f.close()
+        return int(fields[1]) * os.sysconf("SC_PAGE_SIZE")
+    except:
+        return None
+
+def Get_Peak_RSS():
+    """
+    Return the peak resident set size of this process, in bytes.
+    
+    Return None if this cannot be determined on this operating system.
+    
+    Get_Peak_RSS() -> int
+    Get_Peak_RSS() -> None
+    """
+    if resource == None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin": return peak # Bytes
+    return peak * 1024 # Kilobytes
+
+def Bytes_To_MB_String(bytes_):
+    """
+    Return a string of a number of bytes, in megabytes, to 1 decimal place.
+    
+    Bytes_To_MB_String(int) -> str
+    """
+    return "%.1f" % (bytes_ / (1024.0 * 1024))
 
 
 
@@ -485,6 +2911,40 @@ def Parse_Read(file_):
 
 
 
+def Parse_Read__Bytes(file_):
+    """
+    Parse an entry from a FASTQ file open in binary mode. Return a list
+    containing the read's ID, sequence, placeholder line, and QC scores, as
+    bytes.
+    
+    Return a list of empty bytes if there are no reads left.
+    
+    Parse_Read__Bytes(file) -> list<bytes>[4]
+    """
+    readline = file_.readline
+    return [readline().rstrip(b"\r\n"), readline().rstrip(b"\r\n"),
+            readline().rstrip(b"\r\n"), readline().rstrip(b"\r\n")]
+
+def Bytes_To_Str(bytes_):
+    """
+    Convert bytes into a string. (No conversion is needed in Python 2.)
+    
+    Bytes_To_Str(bytes) -> str
+    """
+    if PYTHON_3: return bytes_.decode("latin-1")
+    return bytes_
+
+def Str_To_Bytes(string):
+    """
+    Convert a string into bytes. (No conversion is needed in Python 2.)
+    
+    Str_To_Bytes(str) -> bytes
+    """
+    if PYTHON_3: return string.encode("latin-1")
+    return string
+
+
+
 def Create_Output(ID, seq, placeholder, scores):
     """
     Take the data for FASTQ read and generate a string that can be written to
@@ -624,36 +3084,70 @@ def Parse_Command_Line_Input__Sort_By_R2_BCode(raw_command_line_input):
         print(HELP_DOC)
         return 0
 
+    # Job file mode
+    job_file = None
+    if inputs[0] == "--jobs":
+        inputs.pop(0)
+        if not inputs:
+            printE(STR__invalid_job_file)
+            return 1
+        job_file = inputs.pop(0)
+        valid_job_file = Validate_Read_Path(job_file)
+        if valid_job_file == 1:
+            printE(STR__IO_error_read.format(f = job_file))
+            return 1
+        paths_out = None
+    
     # Initial validation
-    if len(inputs) < 3:
+    elif len(inputs) < 3:
         printE(STR__insufficient_inputs)
         printE(STR__use_help)
         return 1
     
     # Validate inputs
-    path_in_r1 = inputs.pop(0)
-    valid_in_r1 = Validate_Read_Path(path_in_r1)
-    if valid_in_r1 == 1:
-        printE(STR__IO_error_read.format(f = path_in_r1))
-        return 1
-    
-    path_in_r2 = inputs.pop(0)
-    valid_in_r2 = Validate_Read_Path(path_in_r2)
-    if valid_in_r2 == 1:
-        printE(STR__IO_error_read.format(f = path_in_r2))
-        return 1
-    
-    barcode = inputs.pop(0)
-    valid_barcode = Validate_Barcode(barcode)
-    if valid_barcode == 1:
-        printE(STR__invalid_barcode.format(s = barcode))
-        return 1
+    else:
+        path_in_r1 = inputs.pop(0)
+        valid_in_r1 = Validate_Read_Path(path_in_r1)
+        if valid_in_r1 == 1:
+            printE(STR__IO_error_read.format(f = path_in_r1))
+            return 1
+        
+        path_in_r2 = inputs.pop(0)
+        valid_in_r2 = Validate_Read_Path(path_in_r2)
+        if valid_in_r2 == 1:
+            printE(STR__IO_error_read.format(f = path_in_r2))
+            return 1
+        
+        barcode = inputs.pop(0)
+        valid_barcode = Validate_Barcode(barcode)
+        if valid_barcode == 1:
+            printE(STR__invalid_barcode.format(s = barcode))
+            return 1
+        
+        paths_in = [path_in_r1, path_in_r2]
+        paths_out = Generate_Default_Output_Paths(path_in_r1, path_in_r2)
     
     # Set up rest of the parsing
-    paths_in = [path_in_r1, path_in_r2]
-    paths_out = Generate_Default_Output_Paths(path_in_r1, path_in_r2)
     thresholds = [DEFAULT__threshold_match, DEFAULT__threshold_partial]
     removes = [DEFAULT__remove_r1, DEFAULT__remove_r2]
+    discards = []
+    merge_partial = DEFAULT__merge_partial
+    write_unreadable = DEFAULT__write_unreadable
+    count_only = DEFAULT__count_only
+    max_memory = None
+    max_offset = DEFAULT__max_offset
+    quality_cutoff = None
+    quality_weight = DEFAULT__quality_weight
+    engine = DEFAULT__engine
+    lanes = DEFAULT__lanes
+    validate = DEFAULT__validate
+    shard_records = None
+    shard_size = None
+    min_length = None
+    path_lengths = None
+    max_n = None
+    n_window = DEFAULT__n_window
+    n_mates = DEFAULT__n_mates
     
     # Parse the rest
     while inputs:
@@ -691,28 +3185,266 @@ def Parse_Command_Line_Input__Sort_By_R2_BCode(raw_command_line_input):
                 printE(STR__invalid_bool.format(s = r2))
                 return 1
             removes = [r1, r2]
+        elif arg == "-d": # Discard category
+            try:
+                c = inputs.pop(0)
+            except:
+                printE(STR__invalid_category.format(s = ""))
+                return 1
+            category = DICT__categories.get(c.upper())
+            if category == None:
+                printE(STR__invalid_category.format(s = c))
+                return 1
+            discards.append(category)
+        elif arg in ["-m", "-u", "-c", "--validate"]: # Switches
+            try:
+                b = inputs.pop(0)
+            except:
+                b = ""
+            v = Validate_Boolean(b)
+            if v == None:
+                printE(STR__invalid_bool.format(s = b))
+                return 1
+            if arg == "-m": merge_partial = v
+            elif arg == "-u": write_unreadable = v
+            elif arg == "-c": count_only = v
+            else: validate = v
+        elif arg == "--max-memory": # Memory budget
+            try:
+                m = inputs.pop(0)
+            except:
+                m = ""
+            max_memory = Validate_Memory_Size(m)
+            if max_memory == -1:
+                printE(STR__invalid_memory.format(s = m))
+                return 1
+        elif arg == "--max-offset": # Barcode offset
+            try:
+                k = inputs.pop(0)
+            except:
+                k = ""
+            max_offset = Validate_Threshold(k)
+            if max_offset == -1:
+                printE(STR__invalid_offset)
+                return 1
+        elif arg == "--quality-cutoff": # Quality scoring
+            try:
+                q = inputs.pop(0)
+            except:
+                q = ""
+            quality_cutoff = Validate_Threshold(q)
+            if quality_cutoff == -1:
+                printE(STR__invalid_quality_cutoff)
+                return 1
+        elif arg == "--quality-weight":
+            try:
+                w = inputs.pop(0)
+            except:
+                w = ""
+            quality_weight = Validate_Weight(w)
+            if quality_weight == -1:
+                printE(STR__invalid_quality_weight)
+                return 1
+        elif arg == "--engine": # Engine
+            try:
+                e = inputs.pop(0)
+            except:
+                e = ""
+            engine = DICT__engines.get(e.upper())
+            if engine == None:
+                printE(STR__invalid_engine.format(s = e))
+                return 1
+        elif arg == "--shard-records": # Sharding
+            try:
+                n = inputs.pop(0)
+            except:
+                n = ""
+            shard_records = Validate_Threshold(n)
+            if shard_records < 1:
+                printE(STR__invalid_shard_records)
+                return 1
+        elif arg == "--shard-size":
+            try:
+                m = inputs.pop(0)
+            except:
+                m = ""
+            shard_size = Validate_Memory_Size(m)
+            if shard_size < 1:
+                printE(STR__invalid_shard_size.format(s = m))
+                return 1
+        elif arg == "--min-length": # Length
+            try:
+                n = inputs.pop(0)
+            except:
+                n = ""
+            min_length = Validate_Threshold(n)
+            if min_length < 1:
+                printE(STR__invalid_min_length)
+                return 1
+        elif arg == "--length-histogram":
+            try:
+                path_lengths = inputs.pop(0)
+            except:
+                printE(STR__invalid_histogram_path)
+                return 1
+        elif arg == "--max-n": # N content
+            try:
+                f = inputs.pop(0)
+            except:
+                f = ""
+            max_n = Validate_Weight(f)
+            if max_n == -1:
+                printE(STR__invalid_max_n)
+                return 1
+        elif arg == "--n-window":
+            try:
+                w = inputs.pop(0)
+            except:
+                w = ""
+            n_window = DICT__n_windows.get(w.upper())
+            if n_window == None:
+                printE(STR__invalid_n_window.format(s = w))
+                return 1
+        elif arg == "--n-mates":
+            try:
+                m = inputs.pop(0)
+            except:
+                m = ""
+            n_mates = DICT__mates.get(m.upper())
+            if n_mates == None:
+                printE(STR__invalid_n_mates.format(s = m))
+                return 1
+        elif arg == "--lanes": # Concurrent jobs
+            try:
+                n = inputs.pop(0)
+            except:
+                n = ""
+            lanes = Validate_Threshold(n)
+            if lanes < 1:
+                printE(STR__invalid_lanes)
+                return 1
         else: # Invalid
             arg = Strip_X(arg)
             printE(STR__invalid_argument.format(s = arg))
             printE(STR__use_help)
             return 1
     
+    # Quality
+    quality = None
+    if quality_cutoff != None: quality = [quality_cutoff, quality_weight]
+    
+    if count_only: discards = LIST__categories
+    
+    # N content
+    n_policy = None
+    if max_n != None: n_policy = [max_n, n_window, n_mates]
+    
+    # Sharding
+    shards = None
+    if shard_records or shard_size: shards = [shard_records, shard_size]
+    
+    # Job file mode
+    if job_file:
+        if paths_out:
+            printE(STR__jobs_no_outputs)
+            return 1
+        jobs = []
+        for line_number, values in Read_Job_File(job_file):
+            if len(values) not in [3, 9]:
+                printE(STR__invalid_job_line.format(n = line_number,
+                        s = " ".join(values)))
+                return 1
+            for path in values[:2]:
+                if Validate_Read_Path(path) == 1:
+                    printE(STR__IO_error_read.format(f = path))
+                    return 1
+            if Validate_Barcode(values[2]) == 1:
+                printE(STR__invalid_barcode.format(s = values[2]))
+                return 1
+            job_paths_out = values[3:]
+            if not job_paths_out:
+                job_paths_out = Generate_Default_Output_Paths(values[0],
+                        values[1])
+            jobs.append(Sort_Job(values[:2], job_paths_out, values[2]))
+        if not jobs:
+            printE(STR__no_jobs)
+            return 1
+        path = Find_Job_Path_Collision(jobs, discards, merge_partial,
+                write_unreadable, min_length, shards, path_lengths)
+        if path:
+            printE(STR__jobs_collision.format(f = path))
+            return 1
+        # Validate output paths
+        paths = []
+        for job in jobs:
+            paths_unreadable = None
+            if write_unreadable:
+                paths_unreadable = Generate_Default_Unreadable_Paths(
+                        job.paths_in[0], job.paths_in[1])
+            paths_short = None
+            if min_length:
+                paths_short = Generate_Default_Short_Paths(job.paths_in[0],
+                        job.paths_in[1])
+            routing = Get_Output_Routing(job.paths_out, discards,
+                    merge_partial, paths_unreadable, paths_short)
+            for category in LIST__categories:
+                for path in routing.get(category, []):
+                    if shards: paths += Get_Shard_Paths__Check(path)
+                    else: paths.append(path)
+            if shards and routing:
+                paths.append(Generate_Default_Manifest_Path(job.paths_in[0]))
+        if path_lengths: paths.append(path_lengths)
+        valid_out = Validate_Write_Paths__Jobs(paths)
+        if valid_out == 2: return 0
+        if valid_out == 3:
+            printE(STR__IO_error_write_forbid)
+            return 1
+        if valid_out == 4:
+            printE(STR__IO_error_write_unable.format(f = paths[-1]))
+            return 1
+        # Run program
+        return Sort_Jobs_By_R2_Barcode(jobs, thresholds, removes, discards,
+                merge_partial, write_unreadable, max_memory, max_offset,
+                quality, engine, lanes, validate, shards, min_length,
+                path_lengths, n_policy)
+    
+    # Routing
+    paths_unreadable = None
+    if write_unreadable:
+        paths_unreadable = Generate_Default_Unreadable_Paths(path_in_r1,
+                path_in_r2)
+    paths_short = None
+    if min_length:
+        paths_short = Generate_Default_Short_Paths(path_in_r1, path_in_r2)
+    routing = Get_Output_Routing(paths_out, discards, merge_partial,
+            paths_unreadable, paths_short)
+    
     # Validate output paths
-    for path in paths_out:
+    path_manifest = None
+    paths = []
+    for category in LIST__categories:
+        for path in routing.get(category, []):
+            if shards: paths += Get_Shard_Paths__Check(path)
+            else: paths.append(path)
+    if shards and routing:
+        path_manifest = Generate_Default_Manifest_Path(path_in_r1)
+        paths.append(path_manifest)
+    if path_lengths: paths.append(path_lengths)
+    for path in paths:
         valid_out = Validate_Write_Path(path)
         if valid_out == 2: return 0
         if valid_out == 3:
             printE(STR__IO_error_write_forbid)
             return 1
         if valid_out == 4:
-            printE(STR__In_error_write_unable)
+            printE(STR__IO_error_write_unable.format(f = path))
             return 1
     
     # Run program
-    Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes)
-    
-    # Safe exit
-    return 0
+    return Sort_By_R2_Barcode(paths_in, paths_out, barcode, thresholds, removes,
+            discards, merge_partial, paths_unreadable, max_memory, max_offset,
+            quality, engine, validate, shards, path_manifest, min_length,
+            paths_short, path_lengths, n_policy)
 
 
 
@@ -725,7 +3457,7 @@ def Validate_Read_Path(filepath):
     Validate_Read_Path(str) -> int
     """
     try:
-        f = open(filepath, "U")
+        f = open(filepath, MODE__read)
         f.close()
         return 0
     except:
@@ -733,6 +3465,80 @@ def Validate_Read_Path(filepath):
 
 
 
+def Find_Job_Path_Collision(jobs, discards, merge_partial, write_unreadable,
+            min_length, shards, path_lengths):
+    """
+    Check the files which a set of jobs would write, as sorted by
+    Sort_Jobs_By_R2_Barcode with the specified settings. Sharded outputs are
+    checked by the filepaths their shards are generated from.
+    
+    Return the first filepath which would be written more than once, or which is
+    also the input file of a job. Return None if there is no such filepath.
+    
+    Find_Job_Path_Collision(list<Sort_Job>, list<int>, bool, bool, int,
+            [int, int], str) -> str
+    Find_Job_Path_Collision(list<Sort_Job>, list<int>, bool, bool, int,
+            [int, int], str) -> None
+    """
+    paths_in = set()
+    for job in jobs:
+        for path in job.paths_in: paths_in.add(Normalize_Path(path))
+    paths_out = []
+    for job in jobs:
+        paths_unreadable = None
+        if write_unreadable:
+            paths_unreadable = Generate_Default_Unreadable_Paths(
+                    job.paths_in[0], job.paths_in[1])
+        paths_short = None
+        if min_length:
+            paths_short = Generate_Default_Short_Paths(job.paths_in[0],
+                    job.paths_in[1])
+        routing = Get_Output_Routing(job.paths_out, discards, merge_partial,
+                paths_unreadable, paths_short)
+        for category in LIST__categories:
+            paths_out += routing.get(category, [])
+        if shards and routing:
+            paths_out.append(Generate_Default_Manifest_Path(job.paths_in[0]))
+    if path_lengths: paths_out.append(path_lengths)
+    done = set()
+    for path in paths_out:
+        normalized = Normalize_Path(path)
+        if normalized in done or normalized in paths_in: return path
+        done.add(normalized)
+    return None
+
+def Normalize_Path(filepath):
+    """
+    Return an absolute, normalized version of [filepath], so that different
+    filepaths of the same file can be compared.
+    
+    Normalize_Path(str) -> str
+    """
+    return os.path.normcase(os.path.realpath(filepath))
+
+
+
+def Read_Job_File(filepath):
+    """
+    Read a job file. Return a list of the non-empty lines which are not
+    comments, along with their line numbers, with each line split into its
+    values.
+    
+    Read_Job_File(str) -> list<[int, list<str>]>
+    """
+    result = []
+    f = open(filepath, MODE__read)
+    line_number = 0
+    for line in f:
+        line_number += 1
+        values = line.split()
+        if values and not values[0].startswith("#"):
+            result.append([line_number, values])
+    f.close()
+    return result
+
+
+
 def Validate_Barcode(string):
     """
     Validates the string being used as a target barcode.
@@ -763,6 +3569,96 @@ def Generate_Default_Output_Paths(path_in_r1, path_in_r2):
     return [paths_1[0], paths_2[0], paths_1[1], paths_2[1],
             paths_1[2], paths_2[2]]
 
+def Generate_Default_Unreadable_Paths(path_in_r1, path_in_r2):
+    """
+    Generate the two output filepaths for unreadable read pairs, based on the
+    two provided input filepaths.
+    
+    Generate_Default_Unreadable_Paths(str, str) -> list<str>[2]
+    """
+    return [Insert_Before_Extension(path_in_r1, FILEMOD__UNREADABLE),
+            Insert_Before_Extension(path_in_r2, FILEMOD__UNREADABLE)]
+
+def Generate_Default_Short_Paths(path_in_r1, path_in_r2):
+    """
+    Generate the two output filepaths for short read pairs, based on the two
+    provided input filepaths.
+    
+    Generate_Default_Short_Paths(str, str) -> list<str>[2]
+    """
+    return [Insert_Before_Extension(path_in_r1, FILEMOD__SHORT),
+            Insert_Before_Extension(path_in_r2, FILEMOD__SHORT)]
+
+def Generate_Default_Manifest_Path(path_in_r1):
+    """
+    Generate the filepath for the shard manifest, based on the r1 input
+    filepath.
+    
+    Generate_Default_Manifest_Path(str) -> str
+    """
+    index = Find_Period_Index(path_in_r1)
+    if index == -1: return path_in_r1 + FILEMOD__SHARDS
+    return path_in_r1[:index] + FILEMOD__SHARDS
+
+def Get_Shard_Path(filepath, number):
+    """
+    Return the filepath of a numbered shard of [filepath], with the shard
+    number inserted before the file extension.
+    
+    Get_Shard_Path("reads__MATCH.fq", 1) -> "reads__MATCH.0001.fq"
+    
+    Get_Shard_Path(str, int) -> str
+    """
+    number = "." + str(number).zfill(CONFIG__SHARD_DIGITS)
+    return Insert_Before_Extension(filepath, number)
+
+def Get_Shard_Paths__Check(filepath):
+    """
+    Return the filepaths to check for overwriting when [filepath] is written as
+    a series of shards: the first shard, and every other shard of [filepath]
+    which already exists.
+    
+    Get_Shard_Paths__Check(str) -> list<str>
+    """
+    path_first = Get_Shard_Path(filepath, 1)
+    return [path_first] + [path for path in Find_Shard_Paths(filepath)
+            if path != path_first]
+
+def Find_Shard_Paths(filepath):
+    """
+    Return the filepaths of every existing numbered shard of [filepath], such as
+    those of an earlier run, in order of their shard numbers.
+    
+    Find_Shard_Paths(str) -> list<str>
+    """
+    index = Find_Period_Index(filepath)
+    if index == -1: index = len(filepath)
+    folder, stem = os.path.split(filepath[:index])
+    regex = re.compile(re.escape(stem) + "\\.([0-9]{%d,})" %
+            CONFIG__SHARD_DIGITS + re.escape(filepath[index:]) + "$")
+    try:
+        names = os.listdir(folder or ".")
+    except:
+        return []
+    shards = []
+    for name in names:
+        match = regex.match(name)
+        if match:
+            shards.append([int(match.group(1)), os.path.join(folder, name)])
+    shards.sort()
+    return [path for number, path in shards]
+
+def Insert_Before_Extension(filepath, string):
+    """
+    Return [filepath] with [string] inserted before its file extension, or
+    added to the end if it has no file extension.
+    
+    Insert_Before_Extension(str, str) -> str
+    """
+    index = Find_Period_Index(filepath)
+    if index == -1: return filepath + string
+    return filepath[:index] + string + filepath[index:]
+
 def Modify_Path(filepath, index):
     """
     Return 3 filepaths based on a modification of [filepath], using [index] to
@@ -817,7 +3713,7 @@ def Validate_Write_Path(filepath):
     Validate_Write_Path(str) -> int
     """
     try:
-        f = open(filepath, "U")
+        f = open(filepath, MODE__read)
         f.close()
     except: # File does not exist. 
         try:
@@ -842,6 +3738,45 @@ def Validate_Write_Path(filepath):
 
 
 
+def Validate_Write_Paths__Jobs(filepaths):
+    """
+    Validates the output filepaths of many jobs, without creating or truncating
+    any files. If any of the files already exist, the user is asked once
+    whether to overwrite all of them.
+    
+    Return 0 if all the filepaths are writtable.
+    Return 1 if the user decides to overwrite the existing files.
+    Return 2 if the user declines to overwrite the existing files.
+    Return 3 if files exist and the program is set to forbid overwriting.
+    Return 4 if the program is unable to write to one of the filepaths. The
+            [filepaths] list is left with that filepath as its last item.
+    
+    Validate_Write_Paths__Jobs(list<str>) -> int
+    """
+    existing = 0
+    for i in range(len(filepaths)):
+        path = filepaths[i]
+        if os.path.exists(path):
+            if os.path.isdir(path) or not os.access(path, os.W_OK):
+                del filepaths[i+1:]
+                return 4
+            existing += 1
+        else:
+            folder = os.path.dirname(path) or "."
+            if not os.access(folder, os.W_OK):
+                del filepaths[i+1:]
+                return 4
+    if not existing: return 0
+    # Files exist
+    if WRITE_PREVENT: return 3
+    if WRITE_CONFIRM:
+        confirm = raw_input(STR__overwrite_confirm_jobs.format(n=existing))
+        if confirm not in LIST__yes: return 2
+        return 1
+    return 0
+
+
+
 def Strip_X(string):
     """
     Strips leading and trailing inverted commans or brackets if a matching pair
@@ -881,6 +3816,56 @@ def Validate_Threshold(string):
 
 
 
+def Validate_Weight(string):
+    """
+    Validates and returns the weight specified.
+    Return -1 if the input is invalid.
+    
+    @string
+        (str)
+        A string denoting a number from 0 to 1.
+        
+    Validate_Weight(str) -> int/float
+    """
+    try:
+        n = float(string)
+    except:
+        return -1
+    if not 0 <= n <= 1: return -1 # (Also rejects NaN)
+    if n == int(n): return int(n)
+    return n
+
+
+
+def Validate_Memory_Size(string):
+    """
+    Validates and returns the memory size specified, in bytes.
+    Return -1 if the input is invalid.
+    
+    @string
+        (str)
+        A string denoting a positive number of bytes, optionally followed by a
+        K, M, or G suffix, with or without a trailing B. (Ex. 512M, 2GB)
+        
+    Validate_Memory_Size(str) -> int
+    """
+    string = string.upper()
+    if string.endswith("B"): string = string[:-1]
+    unit = ""
+    if string and string[-1] in DICT__memory_units:
+        unit = string[-1]
+        string = string[:-1]
+    try:
+        n = float(string)
+    except:
+        return -1
+    if n != n or n in (float("inf"), -float("inf")): return -1 # NaN, infinity
+    n = int(n * DICT__memory_units[unit])
+    if n <= 0: return -1
+    return n
+
+
+
 def Validate_Boolean(string):
     """
     Validates and returns a boolean, based on the string given.
@@ -945,3 +3930,4 @@ def printM(string):
 
 if AUTORUN and (__name__ == "__main__"):
     exit_code = Parse_Command_Line_Input__Sort_By_R2_BCode(sys.argv)
+    sys.exit(exit_code)
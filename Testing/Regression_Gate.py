@@ -0,0 +1,1275 @@
+HELP_DOC = """
+REGRESSION GATE
+(version 1.0)
+by Angelo Chan
+
+This is a program for checking that changes to Sort_by_r2_BCode.py have not
+changed its results or reduced its speed.
+
+Every sorting engine is run on the example data in the Testing folder, and the
+outputs are checked to be byte-identical to the reference output files. Every
+engine is then run on a larger, randomly generated (but reproducible) input, and
+the outputs are checked to be byte-identical to those of the serial engine.
+The "lanes" engine sorts several jobs at the same time, and the outputs of every
+one of its jobs are checked.
+
+Finally, the throughput (read pairs per second) of every engine is compared to
+a stored baseline. The check fails if the throughput of any engine has dropped
+by more than the permitted percentage, or if there is no baseline to compare to.
+The check also fails if the bytes engine is not faster than the serial (string)
+engine. Both engines trim the barcodes from the reads while being timed.
+Baselines are specific to the computer they were recorded on, and so are not
+distributed with this program. Use "-s Y" to record one before checking any
+changes.
+
+Every engine is also checked against simpler reference calculations, or
+against each other, with the optional features of Sort_by_r2_BCode.py turned
+on: barcode offsets, the search for the barcode at the end of r1 reads in bytes,
+quality weighting, sharding, a minimum length, N policies, and validation of
+defective inputs.
+
+This program does not require an internet connection.
+
+
+
+USAGE:
+
+    python27 Regression_Gate.py [-n <pairs>] [-b <baseline_path>]
+            [-p <percentage>] [-r <repeats>] [-s Y|N] [-m Y|N]
+
+
+
+OPTIONAL:
+
+    pairs
+    
+        (DEFAULT: 100000)
+        
+        The number of read pairs to generate for the larger input.
+    
+    baseline_path
+    
+        (DEFAULT: Benchmark_Baseline.json, in the Testing folder)
+        
+        The filepath of the JSON file containing the baseline throughputs.
+        If this file does not exist, the gate fails, unless "-m Y" is used.
+    
+    percentage
+    
+        (DEFAULT: 10)
+        
+        The maximum permissible drop in throughput, as a percentage of the
+        baseline throughput.
+    
+    repeats
+    
+        (DEFAULT: 3)
+        
+        The number of times each engine is timed. The fastest time is used.
+    
+    (-s)
+    
+        Y|N
+        
+            (DEFAULT: N)
+            
+            Whether the throughputs measured should be saved as the new
+            baseline. The equivalence checks must pass for this to happen.
+            The computer the baseline was recorded on is saved alongside it.
+    
+    (-m)
+    
+        Y|N
+        
+            (DEFAULT: N)
+            
+            Whether a missing baseline is permitted. If so, and there is no
+            baseline, the throughput check is skipped instead of failing.
+
+
+
+EXAMPLES EXPLANATION:
+
+    1:
+    Check the current code against the stored baseline.
+    
+    2:
+    Record a new baseline on this computer, using a larger input.
+    
+    3:
+    Only check the outputs, on a computer with no baseline.
+
+EXAMPLES:
+
+    python27 Regression_Gate.py
+    
+    python27 Regression_Gate.py -n 500000 -s Y
+    
+    python27 Regression_Gate.py -m Y
+
+USAGE:
+
+    python27 Regression_Gate.py [-n <pairs>] [-b <baseline_path>]
+            [-p <percentage>] [-r <repeats>] [-s Y|N] [-m Y|N]
+"""
+
+NAME = "Regression_Gate.py"
+
+
+
+# Configurations ###############################################################
+
+AUTORUN = True
+
+PRINT_ERRORS = True
+PRINT_PROGRESS = True
+PRINT_METRICS = True
+
+
+
+# Minor Configurations #########################################################
+
+CONFIG__SEED = 20181 # Seed for the generated input
+CONFIG__READ_LENGTH = 100
+CONFIG__BARCODE = "CGTGAT"
+CONFIG__LANES = 2 # Lanes used by the lanes engine
+CONFIG__LANE_JOBS = 3 # Jobs sorted by the lanes engine
+
+CONFIG__FEATURE_PAIRS = 20000 # Read pairs used by the feature checks
+CONFIG__MATCHER_SETTINGS = [[1, 1], [1, 3], [2, 3]] # Thresholds, max offsets
+CONFIG__QUALITY = [20, 0.5] # Quality score cutoff and weight
+CONFIG__SHARD_RECORDS = 997
+CONFIG__SHARD_BYTES = 65536
+CONFIG__MIN_LENGTH = 94
+CONFIG__N_RATES = [0, 0, 0.02, 0.1, 0.3] # Chances of a base becoming an N
+CONFIG__N_POLICIES = [ # Max N, N window, N mates
+        [0.05, "READ", "BOTH"],
+        [0.05, "READ", "EITHER"],
+        [0.2, "BARCODE", "R1"],
+        [0.2, "BARCODE", "R2"]]
+CONFIG__BAD_PAIRS = 2500 # Read pairs in the inputs with a defect added
+CONFIG__BAD_PAIR = 1234 # The read pair with the defect
+
+
+
+# Defaults #####################################################################
+"NOTE: altering these will not alter the values displayed in the HELP DOC"
+
+DEFAULT__pairs = 100000
+DEFAULT__baseline = "Benchmark_Baseline.json"
+DEFAULT__percentage = 10.0
+DEFAULT__repeats = 3
+DEFAULT__save = False
+DEFAULT__missing = False
+
+
+
+# Imported Modules #############################################################
+
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+DIR__testing = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIR__testing))
+
+import Sort_by_r2_BCode as SBC
+
+
+
+# Strings ######################################################################
+
+STR__use_help = "\nUse the -h option for help:\n\t "\
+        "python Regression_Gate.py -h"
+
+STR__invalid_argument = "\nERROR: Invalid argument: {s}"
+STR__invalid_number = "\nERROR: Please specify a positive number for {a}. You "\
+        "specified:\n\t{s}"
+STR__invalid_bool = "\nERROR: Please specify Yes/No. You specified:\n\t{s}"
+
+STR__equivalence_begin = "\nChecking output equivalence..."
+STR__equivalence_pass = "\tPASS:  {e} ({t})"
+STR__equivalence_fail = "\tFAIL:  {e} ({t}) - {f} differs"
+STR__lanes_failed = "\tERROR: The lanes engine failed to sort every job."
+
+STR__generating = "\nGenerating {n} read pairs..."
+
+STR__features_begin = "\nChecking features..."
+STR__feature_pass = "\tPASS:  {c}"
+STR__feature_fail = "\tFAIL:  {c} - {f}"
+STR__no_index = "no index was built for threshold {t}, offset {o}"
+STR__no_tail_index = "no tail index was used for threshold {t}"
+STR__tail_differs = "threshold {t}: {s}"
+STR__matcher_differs = "threshold {t}, offset {o}: {s}"
+STR__weighted_differs = "threshold {t}, offset {o}: {s} {q}"
+STR__unweighted_differs = "threshold {t}, offset {o}, weights of 1: {s}"
+STR__shards_differ = "shards {s}: {f} differs"
+STR__pair_differs = "read pair {n} differs"
+STR__histogram_differs = "read length histogram of category {c} differs"
+STR__pairs_count = "{n} read pairs sorted, instead of {e}"
+STR__n_policy = "{m} {w} {r}: {p}"
+STR__bad_input = "{d}, batch size {b}: read pair {n} expected, {f} found"
+
+STR__throughput_begin = "\nMeasuring throughput..."
+STR__throughput = "\t{e}: {s} pairs/sec (baseline: {b})"
+STR__throughput_fail = "\tFAIL:  {e} throughput dropped by {p}% (limit: {l}%)"
+STR__no_baseline = "\nNo baseline found at:\n\t{f}\nThroughput check skipped."
+STR__no_baseline_fail = "\nERROR: No baseline found at:\n\t{f}\nUse \"-s Y\" "\
+        "to record one on this computer, or \"-m Y\" to skip the throughput "\
+        "check."
+STR__bytes_speedup = "\nBytes engine speed, relative to the serial engine, "\
+        "with trimming:\n\t{x}x"
+STR__bytes_speedup_fail = "\tFAIL:  the bytes engine is not faster than the "\
+        "serial engine"
+STR__baseline_machine = "\nBaseline recorded on:\n\t{m}"
+STR__baseline_saved = "\nBaseline saved to:\n\t{f}"
+STR__baseline_not_saved = "\nBaseline not saved, as the equivalence checks "\
+        "failed."
+
+STR__gate_pass = "\nRegression gate passed."
+STR__gate_fail = "\nRegression gate FAILED."
+
+
+
+# Lists ########################################################################
+
+LIST__help = ["-h", "-H", "-help", "-Help", "-HELP"]
+
+LIST__fixtures = [
+        # Name, thresholds, reference outputs
+        ["Test_1 -t 0 0", [0, 0], ["Test_1_R1__MATCH.fq", "Test_1_R2__MATCH.fq",
+                "Test_1_R1__PARTIAL.fq", "Test_1_R2__PARTIAL.fq",
+                "Test_1_R1__ABSENT.fq", "Test_1_R2__ABSENT.fq"]],
+        ["Test_1 -t 0 1", [0, 1], ["match_r1.fq", "match_r2.fq",
+                "partial_r1.fq", "partial_r2.fq",
+                "absent_r1.fq", "absent_r2.fq"]]]
+
+
+
+# Engines ######################################################################
+
+def Engine__Serial(paths_in, paths_out, barcode, thresholds, removes):
+    """
+    Sort one read pair at a time, as strings, writing each straight into the
+    output files.
+    """
+    Run_Sort_Reads(paths_in, paths_out, barcode, thresholds, removes, 1,
+            SBC.ENGINE.STR)
+
+def Engine__Batched(paths_in, paths_out, barcode, thresholds, removes):
+    """
+    Sort read pairs in batches of the default size, as strings, passing each
+    batch to the sinks.
+    """
+    Run_Sort_Reads(paths_in, paths_out, barcode, thresholds, removes,
+            SBC.DEFAULT__batch_size, SBC.ENGINE.STR, batched=True)
+
+def Engine__Bytes(paths_in, paths_out, barcode, thresholds, removes):
+    """
+    Sort one read pair at a time, as bytes, writing each straight into the
+    output files.
+    """
+    Run_Sort_Reads(paths_in, paths_out, barcode, thresholds, removes,
+            SBC.DEFAULT__batch_size, SBC.ENGINE.BYTES)
+
+def Engine__Validated(paths_in, paths_out, barcode, thresholds, removes):
+    """
+    Sort read pairs in batches of the default size, as bytes, validating the
+    read pairs as they are sorted.
+    """
+    Run_Sort_Reads(paths_in, paths_out, barcode, thresholds, removes,
+            SBC.DEFAULT__batch_size, SBC.ENGINE.BYTES, True)
+
+def Engine__Lanes(paths_in, paths_out, barcode, thresholds, removes):
+    """
+    Sort the same read pairs as several jobs, in several lanes at the same time,
+    using the default engine. The outputs of every job after the first are
+    written to the filepaths generated by Get_Job_Output_Paths.
+    """
+    jobs = []
+    for i in range(CONFIG__LANE_JOBS):
+        jobs.append(SBC.Sort_Job(paths_in, Get_Job_Output_Paths(paths_out, i),
+                barcode))
+    if SBC.Sort_Jobs_By_R2_Barcode(jobs, thresholds, removes,
+            lanes = CONFIG__LANES):
+        printE(STR__lanes_failed)
+
+LIST__engines = [
+        # Name, function, number of jobs
+        ["serial", Engine__Serial, 1],
+        ["batched", Engine__Batched, 1],
+        ["bytes", Engine__Bytes, 1],
+        ["validated", Engine__Validated, 1],
+        ["lanes", Engine__Lanes, CONFIG__LANE_JOBS]]
+
+
+
+class Batch_Sink(SBC.File_Pair_Sink):
+    """
+    A File_Pair_Sink which Sort_Reads does not write to directly, so that the
+    read pairs are passed to its Write method in batches.
+    """
+    pass
+
+
+
+def Run_Sort_Reads(paths_in, paths_out, barcode, thresholds, removes,
+            batch_size, engine, validate=False, batched=False):
+    """
+    Sort the reads in [paths_in] into the six files in [paths_out], using
+    Sort_Reads with the specified batch size, engine, and validation setting.
+    
+    If [batched] is True, the sinks are Batch_Sinks, so that the read pairs are
+    passed to them in batches instead of being written straight into the files.
+    
+    Run_Sort_Reads(list<str>[2], list<str>[6], str, [int, int], [bool, bool],
+            int, int, bool, bool) -> None
+    """
+    if engine == SBC.ENGINE.BYTES:
+        mode_read, mode_write, Sink = "rb", "wb", SBC.Bytes_File_Pair_Sink
+    else:
+        mode_read, mode_write, Sink = SBC.MODE__read, "w", SBC.File_Pair_Sink
+    if batched: Sink = Batch_Sink
+    f1 = open(paths_in[0], mode_read)
+    f2 = open(paths_in[1], mode_read)
+    files_out = [open(path, mode_write) for path in paths_out]
+    sinks = {
+            SBC.CATEGORY.MATCH: Sink(files_out[0], files_out[1]),
+            SBC.CATEGORY.PARTIAL: Sink(files_out[2], files_out[3]),
+            SBC.CATEGORY.ABSENT: Sink(files_out[4], files_out[5])}
+    SBC.Sort_Reads(f1, f2, sinks, barcode, thresholds, removes, batch_size,
+            engine=engine, validate=validate)
+    for w in files_out: w.close()
+    f2.close()
+    f1.close()
+
+
+
+# Feature Checks ###############################################################
+
+def Check__Matcher_Index(paths_in, dir_temp):
+    """
+    Check that the neighbourhood index and the bit-parallel search of
+    Barcode_Matcher find the same best matches, in both string and bytes mode,
+    for the r2 reads of [paths_in] with random nucleotides added before them.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Matcher_Index(list<str>[2], str) -> str
+    Check__Matcher_Index(list<str>[2], str) -> None
+    """
+    reads = Get_Offset_Reads(paths_in)
+    for threshold, max_offset in CONFIG__MATCHER_SETTINGS:
+        bits = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold, max_offset, 0)
+        indexed = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold, max_offset)
+        indexed_bytes = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold,
+                max_offset, bytes_mode=True)
+        if indexed.index == None:
+            return STR__no_index.format(t = threshold, o = max_offset)
+        for seq, qc in reads:
+            expected = bits.Match(seq)
+            if (indexed.Match(seq) != expected or
+                    indexed_bytes.Match(SBC.Str_To_Bytes(seq)) != expected):
+                return STR__matcher_differs.format(t = threshold,
+                        o = max_offset, s = seq)
+    return None
+
+def Check__Tail_Matcher(paths_in, dir_temp):
+    """
+    Check that Tail_Matcher finds the same positions as
+    NSeq_Match.Candidate_Match_Position__TAIL for the r1 reads of [paths_in],
+    and for the same reads cut short at a random position (occasionally with an
+    N added to the end), without decoding them.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Tail_Matcher(list<str>[2], str) -> str
+    Check__Tail_Matcher(list<str>[2], str) -> None
+    """
+    rng = random.Random(CONFIG__SEED)
+    complement = SBC.NSeq_Match.Get_Complement(CONFIG__BARCODE)
+    reads = []
+    for r1, r2 in Read_Pairs(paths_in):
+        seq = r1[1]
+        cut = seq[:rng.randint(0, len(seq))]
+        if cut and rng.random() < 0.05: cut = cut[:-1] + "N"
+        reads += [seq, cut]
+    for threshold in sorted(set([0] + [t for t, o in CONFIG__MATCHER_SETTINGS])):
+        matcher = SBC.Tail_Matcher(complement, threshold)
+        if matcher.index == None: return STR__no_tail_index.format(t = threshold)
+        for seq in reads:
+            expected = SBC.NSeq_Match.Candidate_Match_Position__TAIL(seq,
+                    complement, threshold)
+            if matcher.Find(SBC.Str_To_Bytes(seq)) != expected:
+                return STR__tail_differs.format(t = threshold, s = seq)
+    return None
+
+def Check__Weighted(paths_in, dir_temp):
+    """
+    Check that the quality weighted scores of Barcode_Matcher, in both string
+    and bytes mode, are those of a plain, base by base calculation, and that
+    with weights of 1 they are the plain mismatch counts.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Weighted(list<str>[2], str) -> str
+    Check__Weighted(list<str>[2], str) -> None
+    """
+    reads = Get_Offset_Reads(paths_in)
+    table = SBC.Build_Quality_Table(*CONFIG__QUALITY)
+    ones = SBC.Build_Quality_Table(CONFIG__QUALITY[0], 1)
+    mismatches = {}
+    for threshold, max_offset in [[1, 0]] + CONFIG__MATCHER_SETTINGS:
+        plain = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold, max_offset)
+        weighted = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold, max_offset,
+                quality_table=table)
+        weighted_bytes = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold,
+                max_offset, quality_table=table, bytes_mode=True)
+        unweighted = SBC.Barcode_Matcher(CONFIG__BARCODE, threshold,
+                max_offset, quality_table=ones)
+        for seq, qc in reads:
+            expected = Reference_Weighted_Match(seq, qc, table, threshold,
+                    max_offset, mismatches)
+            results = [weighted.Match(seq, qc), weighted_bytes.Match(
+                    SBC.Str_To_Bytes(seq), SBC.Str_To_Bytes(qc))]
+            for result in results:
+                if Get_Scored_Match(result, threshold) != expected:
+                    return STR__weighted_differs.format(t = threshold,
+                            o = max_offset, s = seq, q = qc)
+            if unweighted.Match(seq, qc) != plain.Match(seq):
+                return STR__unweighted_differs.format(t = threshold,
+                        o = max_offset, s = seq)
+    return None
+
+def Check__Shards(paths_in, dir_temp):
+    """
+    Check that, for both engines, the shards written when sharding by the
+    number of read pairs, or by size, are identical to the unsharded output
+    files once concatenated.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Shards(list<str>[2], str) -> str
+    Check__Shards(list<str>[2], str) -> None
+    """
+    paths_ref = Get_Temp_Output_Paths(dir_temp, "shards_reference")
+    Engine__Serial(paths_in, paths_ref, CONFIG__BARCODE, [0, 1], [True, True])
+    path_manifest = os.path.join(dir_temp, "shards.tsv")
+    path_joined = os.path.join(dir_temp, "shards_joined.fq")
+    runs = [
+            [SBC.ENGINE.STR, [CONFIG__SHARD_RECORDS, None]],
+            [SBC.ENGINE.BYTES, [CONFIG__SHARD_RECORDS, None]],
+            [SBC.ENGINE.STR, [None, CONFIG__SHARD_BYTES]],
+            [SBC.ENGINE.BYTES, [None, CONFIG__SHARD_BYTES]]]
+    for engine, shards in runs:
+        paths_out = Get_Temp_Output_Paths(dir_temp, "shards")
+        SBC.Sort_Files(paths_in, paths_out, CONFIG__BARCODE, [0, 1],
+                [True, True], engine=engine, shards=shards,
+                path_manifest=path_manifest)
+        # Shards, by category, from the manifest
+        shards_r1 = {}
+        shards_r2 = {}
+        f = open(path_manifest)
+        f.readline() # Header
+        for line in f:
+            name, path_r1, path_r2, records = line.rstrip("\n").split("\t")
+            shards_r1.setdefault(name, []).append(path_r1)
+            shards_r2.setdefault(name, []).append(path_r2)
+        f.close()
+        # Compare
+        for i in range(3):
+            name = ["MATCH", "PARTIAL", "ABSENT"][i]
+            for paths, path_ref in [[shards_r1.get(name, []), paths_ref[i*2]],
+                    [shards_r2.get(name, []), paths_ref[i*2+1]]]:
+                Concatenate_Files(paths, path_joined)
+                if not Files_Identical(path_joined, path_ref):
+                    return STR__shards_differ.format(s = shards,
+                            f = os.path.basename(path_ref))
+            for path in shards_r1.get(name, []) + shards_r2.get(name, []):
+                os.remove(path)
+    return None
+
+def Check__Min_Length(paths_in, dir_temp):
+    """
+    Check that, for both engines, sorting with a minimum length sorts every read
+    pair as it would be sorted without one, except that read pairs with a
+    trimmed read shorter than the minimum length are sorted as short instead.
+    
+    Also check that the read length histograms only count the read pairs which
+    are yielded, with the short read pairs discarded. (-d SHORT)
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Min_Length(list<str>[2], str) -> str
+    Check__Min_Length(list<str>[2], str) -> None
+    """
+    for engine in [SBC.ENGINE.STR, SBC.ENGINE.BYTES]:
+        expected = []
+        for category, r1, r2 in Run_Iterate_Sorted_Batches(paths_in, engine):
+            if category != SBC.CATEGORY.UNREADABLE and (
+                    len(r1[1]) < CONFIG__MIN_LENGTH or
+                    len(r2[1]) < CONFIG__MIN_LENGTH):
+                category = SBC.CATEGORY.SHORT
+            expected.append((category, r1, r2))
+        results = Run_Iterate_Sorted_Batches(paths_in, engine,
+                min_length = CONFIG__MIN_LENGTH)
+        problem = Compare_Sorted(results, expected)
+        if problem: return problem
+        # Histograms, without the short read pairs
+        metrics = SBC.Sort_Metrics()
+        categories = [c for c in SBC.LIST__categories
+                if c != SBC.CATEGORY.SHORT]
+        results = Run_Iterate_Sorted_Batches(paths_in, engine,
+                min_length = CONFIG__MIN_LENGTH, metrics = metrics,
+                categories = categories, lengths = True)
+        counts = [[{}, {}] for c in metrics.lengths]
+        for category, r1, r2 in results:
+            for counts_read, read in zip(counts[category], [r1, r2]):
+                length = len(read[1])
+                counts_read[length] = counts_read.get(length, 0) + 1
+        for category in SBC.LIST__categories:
+            for counts_read, histogram in zip(counts[category],
+                    metrics.lengths[category]):
+                if counts_read != dict([(length, n) for length, n in
+                        enumerate(histogram) if n]):
+                    return STR__histogram_differs.format(c = category)
+    return None
+
+def Check__Max_N(paths_in, dir_temp):
+    """
+    Check that, for both engines and several N policies, sorting with an N
+    policy sorts every read pair as unreadable if it has too many N bases, by a
+    plain, base by base calculation, and otherwise as the read pair would be
+    sorted on its own.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Max_N(list<str>[2], str) -> str
+    Check__Max_N(list<str>[2], str) -> None
+    """
+    # Add N bases
+    rng = random.Random(CONFIG__SEED)
+    pairs = Read_Pairs(paths_in)
+    for r1, r2 in pairs:
+        for read in [r1, r2]:
+            rate = rng.choice(CONFIG__N_RATES)
+            read[1] = "".join([[c, "N"][rng.random() < rate] for c in read[1]])
+    paths_n = [os.path.join(dir_temp, "n_r1.fq"),
+            os.path.join(dir_temp, "n_r2.fq")]
+    paths_usable = [os.path.join(dir_temp, "usable_r1.fq"),
+            os.path.join(dir_temp, "usable_r2.fq")]
+    Write_Pairs(paths_n, pairs)
+    
+    for max_n, window, mates in CONFIG__N_POLICIES:
+        n_policy = [max_n, SBC.DICT__n_windows[window], SBC.DICT__mates[mates]]
+        unreadables = [Reference_Unreadable(r1[1], r2[1], n_policy)
+                for r1, r2 in pairs]
+        Write_Pairs(paths_usable, [pair for pair, unreadable in
+                zip(pairs, unreadables) if not unreadable])
+        for engine in [SBC.ENGINE.STR, SBC.ENGINE.BYTES]:
+            usables = Run_Iterate_Sorted_Batches(paths_usable, engine)
+            usables.reverse()
+            expected = []
+            for r1, r2 in Read_Pairs(paths_n, engine):
+                if unreadables[len(expected)]:
+                    expected.append((SBC.CATEGORY.UNREADABLE, r1, r2))
+                else: expected.append(usables.pop())
+            results = Run_Iterate_Sorted_Batches(paths_n, engine,
+                    n_policy = n_policy)
+            problem = Compare_Sorted(results, expected)
+            if problem:
+                return STR__n_policy.format(m = max_n, w = window, r = mates,
+                        p = problem)
+    return None
+
+def Check__Bad_Input(paths_in, dir_temp):
+    """
+    Check that, for both engines and for batches of one and of the default
+    size, validation fails at the right read pair of inputs with a defect
+    added: IDs which do not match, sequences and quality scores of different
+    lengths, IDs which only differ by a final 1 and 2, and a missing read.
+    
+    Return a description of the first difference found, or None.
+    
+    Check__Bad_Input(list<str>[2], str) -> str
+    Check__Bad_Input(list<str>[2], str) -> None
+    """
+    pairs = Read_Pairs(paths_in)[:CONFIG__BAD_PAIRS]
+    paths_bad = [os.path.join(dir_temp, "bad_r1.fq"),
+            os.path.join(dir_temp, "bad_r2.fq")]
+    runs = [[SBC.ENGINE.STR, 1], [SBC.ENGINE.STR, SBC.DEFAULT__batch_size],
+            [SBC.ENGINE.BYTES, 1], [SBC.ENGINE.BYTES, SBC.DEFAULT__batch_size]]
+    for name in ["IDs", "lengths", "final 1 and 2", "missing read"]:
+        bad = [[list(r1), list(r2)] for r1, r2 in pairs]
+        expected = CONFIG__BAD_PAIR
+        r1, r2 = bad[expected - 1]
+        if name == "IDs":
+            r2[0] = "@other/2"
+        elif name == "lengths":
+            r1[3] = r1[3][:-1]
+        elif name == "final 1 and 2":
+            r1[0] = "@SRR1.1"
+            r2[0] = "@SRR1.2"
+        else: # Missing read
+            expected = len(bad)
+            bad[-1][1] = None
+        Write_Pairs(paths_bad, bad)
+        for engine, batch_size in runs:
+            try:
+                Run_Iterate_Sorted_Batches(paths_bad, engine,
+                        batch_size = batch_size, validate = True)
+                found = None
+            except SBC.Read_Pair_Error as e:
+                found = e.number
+            if found != expected:
+                return STR__bad_input.format(d = name, b = batch_size,
+                        n = expected, f = found)
+    return None
+
+LIST__features = [
+        ["matcher index", Check__Matcher_Index],
+        ["tail matcher", Check__Tail_Matcher],
+        ["weighted scores", Check__Weighted],
+        ["shards", Check__Shards],
+        ["min length", Check__Min_Length],
+        ["max N", Check__Max_N],
+        ["bad input", Check__Bad_Input]]
+
+
+
+def Run_Iterate_Sorted_Batches(paths_in, engine, **settings):
+    """
+    Sort the reads in [paths_in], with thresholds of 0 and 1 and the barcode
+    removed, using Iterate_Sorted_Batches with the specified engine and other
+    settings.
+    
+    Return a list of every (category, r1, r2) tuple yielded, in order.
+    
+    Run_Iterate_Sorted_Batches(list<str>[2], int, ...) ->
+            list<(int, list<str>[4], list<str>[4])>
+    """
+    mode_read = [SBC.MODE__read, "rb"][engine == SBC.ENGINE.BYTES]
+    f1 = open(paths_in[0], mode_read)
+    f2 = open(paths_in[1], mode_read)
+    results = []
+    try:
+        for batch in SBC.Iterate_Sorted_Batches(f1, f2, CONFIG__BARCODE, [0, 1],
+                [True, True], engine=engine, **settings):
+            results.extend(batch)
+    finally:
+        f2.close()
+        f1.close()
+    return results
+
+def Compare_Sorted(results, expected):
+    """
+    Compare two lists of sorted read pairs, as returned by
+    Run_Iterate_Sorted_Batches.
+    
+    Return a description of the first difference, or None if they are the same.
+    
+    Compare_Sorted(list<(int, list, list)>, list<(int, list, list)>) -> str
+    Compare_Sorted(list<(int, list, list)>, list<(int, list, list)>) -> None
+    """
+    for i in range(min(len(results), len(expected))):
+        if results[i] != expected[i]:
+            return STR__pair_differs.format(n = i + 1)
+    if len(results) != len(expected):
+        return STR__pairs_count.format(n = len(results), e = len(expected))
+    return None
+
+def Reference_Weighted_Match(seq, qc, table, threshold, max_offset, cache):
+    """
+    Return the lowest total weight of the mismatches between CONFIG__BARCODE
+    and [seq], at up to [max_offset] nucleotides into [seq], and the offset at
+    which it first occurs, as returned by Get_Scored_Match. Mismatches are found
+    one base at a time, with NSeq_Match, and cached in [cache].
+    
+    The mismatches at bases with a reduced weight are counted, and multiplied by
+    the reduced weight, so that the rounding is the same as Barcode_Matcher's.
+    
+    Reference_Weighted_Match(str, str, list<int/float>[256], int, int,
+            dict<(str, str), int>) -> [int/float, int]
+    """
+    length = len(CONFIG__BARCODE)
+    weight = min(table)
+    best = None
+    best_offset = 0
+    for offset in range(min(max_offset, len(seq) - length) + 1):
+        mismatches = 0
+        reduced = 0
+        for i in range(length):
+            key = (CONFIG__BARCODE[i], seq[offset + i])
+            if key not in cache: cache[key] = SBC.NSeq_Match.NSeq_Match(*key)
+            if cache[key]:
+                mismatches += 1
+                if table[ord(qc[offset + i])] < 1: reduced += 1
+        score = (mismatches - reduced) + reduced * weight
+        if best == None or score < best:
+            best = score
+            best_offset = offset
+    return Get_Scored_Match([best, best_offset], threshold)
+
+def Get_Scored_Match(result, threshold):
+    """
+    Return the result of a Barcode_Matcher, reduced to what affects the sorting
+    of a read pair: the score and offset if the score is within [threshold], and
+    [None, None] otherwise.
+    
+    Get_Scored_Match([int/float, int], int) -> [int/float, int]
+    """
+    if result[0] > threshold: return [None, None]
+    return result
+
+def Reference_Unreadable(r1_seq, r2_seq, n_policy):
+    """
+    Return True if a read pair has too many N bases according to [n_policy], as
+    described for Sort_By_R2_Barcode, counting them one base at a time.
+    
+    Reference_Unreadable(str, str, [int/float, int, int]) -> bool
+    """
+    max_n, window, mates = n_policy
+    if window == SBC.N_WINDOW.BARCODE:
+        r1_seq = r1_seq[-len(CONFIG__BARCODE):]
+        r2_seq = r2_seq[:len(CONFIG__BARCODE)] # (No offset)
+    too_many = []
+    for seq in [r1_seq, r2_seq]:
+        n = len([c for c in seq if c == "N"])
+        too_many.append(n > max_n * len(seq))
+    if mates == SBC.MATES.R1: return too_many[0]
+    if mates == SBC.MATES.R2: return too_many[1]
+    if mates == SBC.MATES.EITHER: return too_many[0] or too_many[1]
+    return too_many[0] and too_many[1]
+
+def Get_Offset_Reads(paths_in):
+    """
+    Return the sequences and quality scores of the r2 reads in [paths_in], with
+    between 0 and the largest offset of CONFIG__MATCHER_SETTINGS random
+    nucleotides (or occasionally an N) added before each read.
+    
+    Get_Offset_Reads(list<str>[2]) -> list<[str, str]>
+    """
+    rng = random.Random(CONFIG__SEED)
+    max_offset = max([o for t, o in CONFIG__MATCHER_SETTINGS])
+    results = []
+    for r1, r2 in Read_Pairs(paths_in):
+        offset = rng.randint(0, max_offset)
+        prefix = Random_Sequence(rng, offset)
+        if offset and rng.random() < 0.05:
+            pos = rng.randint(0, offset - 1)
+            prefix = prefix[:pos] + "N" + prefix[pos+1:]
+        results.append([prefix + r2[1], Random_Qualities(rng, offset) + r2[3]])
+    return results
+
+
+
+def Read_Pairs(paths_in, engine=None):
+    """
+    Return every read pair in [paths_in], as lists of strings, or as lists of
+    bytes with the BYTES engine.
+    
+    Read_Pairs(list<str>[2], int) -> list<[list<str>[4], list<str>[4]]>
+    """
+    if engine == SBC.ENGINE.BYTES:
+        mode_read, parse = "rb", SBC.Parse_Read__Bytes
+    else: mode_read, parse = SBC.MODE__read, SBC.Parse_Read
+    f1 = open(paths_in[0], mode_read)
+    f2 = open(paths_in[1], mode_read)
+    pairs = []
+    r1 = parse(f1)
+    r2 = parse(f2)
+    while r1[0] and r2[0]:
+        pairs.append([r1, r2])
+        r1 = parse(f1)
+        r2 = parse(f2)
+    f2.close()
+    f1.close()
+    return pairs
+
+def Write_Pairs(paths_out, pairs):
+    """
+    Write read pairs, as returned by Read_Pairs, into a pair of FASTQ files. A
+    read of None is left out.
+    
+    Write_Pairs(list<str>[2], list<[list<str>[4], list<str>[4]]>) -> None
+    """
+    w1 = open(paths_out[0], "w")
+    w2 = open(paths_out[1], "w")
+    for r1, r2 in pairs:
+        if r1: w1.write("\n".join(r1) + "\n")
+        if r2: w2.write("\n".join(r2) + "\n")
+    w2.close()
+    w1.close()
+
+def Concatenate_Files(paths_in, path_out):
+    """
+    Write the contents of every file in [paths_in], in order, into [path_out].
+    
+    Concatenate_Files(list<str>, str) -> None
+    """
+    w = open(path_out, "wb")
+    for path in paths_in:
+        f = open(path, "rb")
+        w.write(f.read())
+        f.close()
+    w.close()
+
+
+
+# Gate Code ####################################################################
+
+def Regression_Gate(pairs, path_baseline, percentage, repeats, save,
+            missing=False):
+    """
+    Run the equivalence checks and the throughput check.
+    
+    @pairs
+            (int)
+            The number of read pairs to generate for the larger input.
+    @path_baseline
+            (str - filepath)
+            The filepath of the baseline JSON file.
+    @percentage
+            (float)
+            The maximum permissible drop in throughput, as a percentage.
+    @repeats
+            (int)
+            The number of times each engine is timed.
+    @save
+            (bool)
+            Whether to save the measured throughputs as the new baseline.
+    @missing
+            (bool)
+            Whether a missing baseline is permitted. If False, a missing
+            baseline is a failure.
+    
+    Return 0 if all checks pass, and 1 otherwise.
+    
+    Regression_Gate(int, str, float, int, bool, bool) -> int
+    """
+    failures = 0
+    dir_temp = tempfile.mkdtemp()
+    try:
+        # Equivalence - Fixtures
+        printP(STR__equivalence_begin)
+        paths_in = [os.path.join(DIR__testing, "Test_1_R1.fq"),
+                os.path.join(DIR__testing, "Test_1_R2.fq")]
+        for name, thresholds, references in LIST__fixtures:
+            paths_ref = [os.path.join(DIR__testing, r) for r in references]
+            failures += Check_Engines(paths_in, paths_ref, thresholds, name,
+                    dir_temp)
+        
+        # Equivalence - Generated
+        printP(STR__generating.format(n = pairs))
+        paths_gen = [os.path.join(dir_temp, "gen_r1.fq"),
+                os.path.join(dir_temp, "gen_r2.fq")]
+        Generate_Test_Input(paths_gen, pairs, CONFIG__BARCODE, CONFIG__SEED)
+        paths_ref = Get_Temp_Output_Paths(dir_temp, "reference")
+        Engine__Serial(paths_gen, paths_ref, CONFIG__BARCODE, [0, 1],
+                [True, True])
+        failures += Check_Engines(paths_gen, paths_ref, [0, 1], "generated",
+                dir_temp)
+        
+        # Features
+        printP(STR__features_begin)
+        paths_features = [os.path.join(dir_temp, "features_r1.fq"),
+                os.path.join(dir_temp, "features_r2.fq")]
+        Write_Pairs(paths_features,
+                Read_Pairs(paths_gen)[:CONFIG__FEATURE_PAIRS])
+        failures += Check_Features(paths_features, dir_temp)
+        
+        # Throughput
+        printP(STR__throughput_begin)
+        throughputs = Measure_Throughputs(paths_gen, repeats, dir_temp)
+    finally:
+        shutil.rmtree(dir_temp)
+    for name in throughputs: throughputs[name] = pairs / throughputs[name]
+    
+    # Save baseline
+    if save:
+        if failures: printE(STR__baseline_not_saved)
+        else:
+            Save_Baseline(path_baseline, throughputs, pairs)
+            printP(STR__baseline_saved.format(f = path_baseline))
+    
+    # Compare to baseline
+    baseline, machine = Load_Baseline(path_baseline)
+    if baseline == None:
+        if missing: printM(STR__no_baseline.format(f = path_baseline))
+        else:
+            printE(STR__no_baseline_fail.format(f = path_baseline))
+            failures += 1
+    elif machine: printM(STR__baseline_machine.format(m = machine))
+    for name, _, _ in LIST__engines:
+        current = throughputs[name]
+        previous = None
+        if baseline: previous = baseline.get(name)
+        s_previous = "-"
+        if previous: s_previous = "%.0f" % previous
+        printM(STR__throughput.format(e = name, s = "%.0f" % current,
+                b = s_previous))
+        if previous:
+            drop = (previous - current) * 100.0 / previous
+            if drop > percentage:
+                printE(STR__throughput_fail.format(e = name, p = "%.1f" % drop,
+                        l = percentage))
+                failures += 1
+    
+    # Bytes engine
+    speedup = throughputs["bytes"] / throughputs["serial"]
+    printM(STR__bytes_speedup.format(x = "%.2f" % speedup))
+    if speedup <= 1:
+        printE(STR__bytes_speedup_fail)
+        failures += 1
+    
+    # Result
+    if failures:
+        printE(STR__gate_fail)
+        return 1
+    printP(STR__gate_pass)
+    return 0
+
+
+
+def Check_Features(paths_in, dir_temp):
+    """
+    Run every feature check on [paths_in].
+    
+    Return the number of feature checks which failed.
+    
+    Check_Features(list<str>[2], str) -> int
+    """
+    failures = 0
+    for name, function in LIST__features:
+        problem = function(paths_in, dir_temp)
+        if problem:
+            printE(STR__feature_fail.format(c = name, f = problem))
+            failures += 1
+        else:
+            printP(STR__feature_pass.format(c = name))
+    return failures
+
+
+
+def Check_Engines(paths_in, paths_ref, thresholds, name, dir_temp):
+    """
+    Run every engine on [paths_in] and compare each of their six output files,
+    for every job the engine sorts, to the six files in [paths_ref].
+    
+    Return the number of engines whose outputs were not byte-identical.
+    
+    Check_Engines(list<str>[2], list<str>[6], [int, int], str, str) -> int
+    """
+    failures = 0
+    for engine, function, jobs in LIST__engines:
+        paths_out = Get_Temp_Output_Paths(dir_temp, engine)
+        for i in range(jobs): # Outputs left by a previous check
+            for path in Get_Job_Output_Paths(paths_out, i):
+                if os.path.isfile(path): os.remove(path)
+        function(paths_in, paths_out, CONFIG__BARCODE, thresholds,
+                [True, True])
+        different = None
+        for i in range(jobs):
+            paths_job = Get_Job_Output_Paths(paths_out, i)
+            for path_out, path_ref in zip(paths_job, paths_ref):
+                if not (os.path.isfile(path_out) and
+                        Files_Identical(path_out, path_ref)):
+                    different = os.path.basename(path_out)
+                    break
+            if different: break
+        if different:
+            printE(STR__equivalence_fail.format(e = engine, t = name,
+                    f = different))
+            failures += 1
+        else:
+            printP(STR__equivalence_pass.format(e = engine, t = name))
+    return failures
+
+
+
+def Measure_Throughputs(paths_in, repeats, dir_temp):
+    """
+    Time every engine on [paths_in], [repeats] times each.
+    
+    Return a dictionary of the fastest time taken by each engine, in seconds,
+    divided by the number of jobs the engine sorts.
+    
+    Measure_Throughputs(list<str>[2], int, str) -> dict<str, float>
+    """
+    results = {}
+    paths_out = Get_Temp_Output_Paths(dir_temp, "timing")
+    for engine, function, jobs in LIST__engines:
+        best = None
+        for i in range(repeats):
+            start = time.time()
+            function(paths_in, paths_out, CONFIG__BARCODE, [0, 1],
+                    [True, True])
+            taken = time.time() - start
+            if best == None or taken < best: best = taken
+        results[engine] = max(best / jobs, 1e-9)
+    return results
+
+
+
+def Generate_Test_Input(paths_out, pairs, barcode, seed):
+    """
+    Generate a pair of FASTQ files containing a reproducible mix of read pairs
+    with complete barcodes, partial barcodes, no barcodes, and unreadable
+    sequences.
+    
+    Generate_Test_Input(list<str>[2], int, str, int) -> None
+    """
+    rng = random.Random(seed)
+    complement = SBC.NSeq_Match.Get_Complement(barcode)
+    length = len(barcode)
+    w1 = open(paths_out[0], "w")
+    w2 = open(paths_out[1], "w")
+    for i in range(pairs):
+        roll = rng.random()
+        r1 = Random_Sequence(rng, CONFIG__READ_LENGTH)
+        r2 = Random_Sequence(rng, CONFIG__READ_LENGTH)
+        if roll < 0.05: # Unreadable
+            r1 = r2 = "N" * CONFIG__READ_LENGTH
+        elif roll < 0.55: # Match
+            tail = complement[:rng.randint(0, length)]
+            r1 = r1[:CONFIG__READ_LENGTH - len(tail)] + tail
+            r2 = barcode + r2[length:]
+        elif roll < 0.70: # Partial
+            pos = rng.randint(0, length - 1)
+            c = rng.choice([n for n in "ACGT" if n != barcode[pos]])
+            r2 = barcode[:pos] + c + barcode[pos+1:] + r2[length:]
+        q1 = Random_Qualities(rng, CONFIG__READ_LENGTH)
+        q2 = Random_Qualities(rng, CONFIG__READ_LENGTH)
+        w1.write("@pair_%d/1\n%s\n+\n%s\n" % (i, r1, q1))
+        w2.write("@pair_%d/2\n%s\n+\n%s\n" % (i, r2, q2))
+    w2.close()
+    w1.close()
+
+def Random_Sequence(rng, length):
+    """
+    Return a random nucleotide sequence of the specified length.
+    
+    Random_Sequence(random.Random, int) -> str
+    """
+    return "".join([rng.choice("ACGT") for i in range(length)])
+
+def Random_Qualities(rng, length):
+    """
+    Return a random string of Phred+33 quality scores of the specified length.
+    
+    Random_Qualities(random.Random, int) -> str
+    """
+    return "".join([chr(rng.randint(35, 73)) for i in range(length)])
+
+
+
+def Get_Temp_Output_Paths(dir_temp, prefix):
+    """
+    Return six output filepaths in [dir_temp], using the specified prefix.
+    
+    Get_Temp_Output_Paths(str, str) -> list<str>[6]
+    """
+    names = ["match_r1", "match_r2", "partial_r1", "partial_r2", "absent_r1",
+            "absent_r2"]
+    return [os.path.join(dir_temp, prefix + "_" + n + ".fq") for n in names]
+
+def Get_Job_Output_Paths(paths_out, job):
+    """
+    Return the six output filepaths of job number [job] of an engine which sorts
+    several jobs. The first job uses [paths_out] itself.
+    
+    Get_Job_Output_Paths(list<str>[6], int) -> list<str>[6]
+    """
+    if not job: return paths_out
+    suffix = "_job%d" % job
+    return [os.path.splitext(p)[0] + suffix + os.path.splitext(p)[1]
+            for p in paths_out]
+
+def Files_Identical(path_1, path_2):
+    """
+    Return True if the two files are byte-identical, and False otherwise.
+    
+    Files_Identical(str, str) -> bool
+    """
+    f1 = open(path_1, "rb")
+    f2 = open(path_2, "rb")
+    result = f1.read() == f2.read()
+    f2.close()
+    f1.close()
+    return result
+
+
+
+def Load_Baseline(filepath):
+    """
+    Return the dictionary of baseline throughputs, by engine, stored in
+    [filepath], and a description of the computer they were recorded on.
+    
+    Return [None, None] if the file does not exist or could not be read.
+    
+    Load_Baseline(str) -> [dict<str, float>, str]
+    Load_Baseline(str) -> [None, None]
+    """
+    try:
+        f = open(filepath)
+        data = json.load(f)
+        f.close()
+        return [data["pairs_per_sec"], data.get("machine")]
+    except:
+        return [None, None]
+
+def Save_Baseline(filepath, throughputs, pairs):
+    """
+    Save the throughputs of each engine as a baseline JSON file, along with a
+    description of the computer they were measured on.
+    
+    Save_Baseline(str, dict<str, float>, int) -> None
+    """
+    machine = "{p}; {c}; Python {v}".format(p = platform.platform(),
+            c = platform.processor() or platform.machine(),
+            v = platform.python_version())
+    data = {"pairs": pairs, "pairs_per_sec": throughputs, "machine": machine}
+    f = open(filepath, "w")
+    json.dump(data, f, indent=4, separators=(",", ": "),
+            sort_keys=True)
+    f.write("\n")
+    f.close()
+
+
+
+# Command Line Parsing #########################################################
+
+def Parse_Command_Line_Input__Regression_Gate(raw_command_line_input):
+    """
+    Parse the command line input and call the Regression_Gate function with
+    appropriate arguments if the command line input is valid.
+    """
+    inputs = Strip_Non_Inputs(raw_command_line_input)
+    
+    # Help option
+    if inputs and inputs[0] in LIST__help:
+        print(HELP_DOC)
+        return 0
+    
+    # Defaults
+    pairs = DEFAULT__pairs
+    path_baseline = os.path.join(DIR__testing, DEFAULT__baseline)
+    percentage = DEFAULT__percentage
+    repeats = DEFAULT__repeats
+    save = DEFAULT__save
+    missing = DEFAULT__missing
+    
+    # Parse
+    while inputs:
+        arg = inputs.pop(0)
+        try:
+            value = inputs.pop(0)
+        except:
+            value = ""
+        if arg == "-n": # Pairs
+            pairs = Validate_Number(value, int)
+            if pairs == -1:
+                printE(STR__invalid_number.format(a = arg, s = value))
+                return 1
+        elif arg == "-b": # Baseline
+            path_baseline = value
+        elif arg == "-p": # Percentage
+            percentage = Validate_Number(value, float)
+            if percentage == -1:
+                printE(STR__invalid_number.format(a = arg, s = value))
+                return 1
+        elif arg == "-r": # Repeats
+            repeats = Validate_Number(value, int)
+            if repeats == -1:
+                printE(STR__invalid_number.format(a = arg, s = value))
+                return 1
+        elif arg == "-s": # Save
+            save = SBC.Validate_Boolean(value)
+            if save == None:
+                printE(STR__invalid_bool.format(s = value))
+                return 1
+        elif arg == "-m": # Missing baseline
+            missing = SBC.Validate_Boolean(value)
+            if missing == None:
+                printE(STR__invalid_bool.format(s = value))
+                return 1
+        else: # Invalid
+            printE(STR__invalid_argument.format(s = arg))
+            printE(STR__use_help)
+            return 1
+    
+    # Run program
+    return Regression_Gate(pairs, path_baseline, percentage, repeats, save,
+            missing)
+
+
+
+def Validate_Number(string, type_):
+    """
+    Validates and returns the positive number specified, converted to [type_].
+    Return -1 if the input is invalid.
+    
+    Validate_Number(str, type) -> int/float
+    """
+    try:
+        n = type_(string)
+    except:
+        return -1
+    if n <= 0: return -1
+    return n
+
+
+
+def Strip_Non_Inputs(list1):
+    """
+    Remove the runtime environment variable and program name from the inputs.
+    Assumes this module was called and the name of this module is in the list of
+    command line inputs.
+    
+    Strip_Non_Inputs(list<str>) -> list<str>
+    """
+    if NAME in list1[0]: return list1[1:]
+    return list1[2:]
+
+
+
+# Controlled Print Statements ##################################################
+
+def printE(string):
+    """
+    A wrapper for the basic print statement.
+    It is intended to be used for printing error messages.
+    It can be controlled by a global variable.
+    """
+    if PRINT_ERRORS: print(string)
+
+def printP(string):
+    """
+    A wrapper for the basic print statement.
+    It is intended to be used for printing progress messages.
+    It can be controlled by a global variable.
+    """
+    if PRINT_PROGRESS: print(string)
+
+def printM(string):
+    """
+    A wrapper for the basic print statement.
+    It is intended to be used for printing metrics.
+    It can be controlled by a global variable.
+    """
+    if PRINT_METRICS: print(string)
+
+
+
+# Main Loop ####################################################################
+
+if AUTORUN and (__name__ == "__main__"):
+    SBC.PRINT_PROGRESS = False
+    SBC.PRINT_METRICS = False
+    exit_code = Parse_Command_Line_Input__Regression_Gate(sys.argv)
+    sys.exit(exit_code)